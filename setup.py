@@ -1,5 +1,23 @@
+import os
 from setuptools import setup, find_packages
 
+# Optionally compile the hot ndarray manipulation modules with Cython.
+# Opt in with TOKENSMITH_CYTHONIZE=1; falls back to the pure Python package
+# if Cython is not installed. `pip install` builds through Poetry (see
+# pyproject.toml), which ignores this file, so run it directly instead:
+#   TOKENSMITH_CYTHONIZE=1 python setup.py build_ext --inplace
+ext_modules = []
+if os.environ.get('TOKENSMITH_CYTHONIZE') == '1':
+    try:
+        from Cython.Build import cythonize
+    except ImportError:
+        print('Cython not installed, building pure Python package.')
+    else:
+        ext_modules = cythonize(
+            ['tokensmith/edit/handler.py', 'tokensmith/utils.py'],
+            compiler_directives={'language_level': 3},
+        )
+
 setup(
     name='tokensmith',
     version='0.1.0',
@@ -10,6 +28,7 @@ setup(
     long_description_content_type='text/markdown',
     url='https://github.com/yourusername/tokensmith',  # Replace with your actual repository URL
     packages=find_packages(),
+    ext_modules=ext_modules,
     classifiers=[
         'Programming Language :: Python :: 3',
         'License :: OSI Approved :: MIT License',  # Replace with your actual license
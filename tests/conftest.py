@@ -0,0 +1,108 @@
+import numpy as np
+import pytest
+
+from tokensmith.utils import BatchInfo, WriteableMMapIndexedDataset, _index_pointers
+
+
+class NeoXIndex:
+    """Shaped like GPT-NeoX's `MMapIndexedDataset.Index`: the offsets are only stored in the private `_pointers`."""
+
+    def __init__(self, sizes, dtype):
+        self.dtype = dtype
+        self._sizes = np.asarray(sizes, dtype=np.int32)
+        self._pointers = np.concatenate(([0], np.cumsum(self._sizes[:-1], dtype=np.int64))) * np.dtype(dtype).itemsize
+        self._doc_idx = np.arange(len(sizes) + 1, dtype=np.int64)
+
+    @property
+    def sizes(self):
+        return self._sizes
+
+    @property
+    def doc_idx(self):
+        return self._doc_idx
+
+    def __getitem__(self, i):
+        return self._pointers[i], self._sizes[i]
+
+    def __len__(self):
+        return len(self._sizes)
+
+
+def build_dataset(directory, sizes, sample_idx, shuffle_idx, dtype=np.uint16):
+    """
+    Writes a corpus whose tokens are 0, 1, 2, ... split into documents of the given sizes, plus the
+    doc/sample/shuffle indexes of a training run over it, and opens it without GPT-NeoX's megatron package.
+    Returns the dataset and the corpus tokens.
+    """
+    tokens = np.arange(sum(sizes), dtype=dtype)
+    bin_path = directory / "corpus.bin"
+    tokens.tofile(bin_path)
+
+    prefix = str(directory / "run")
+    np.save(f"{prefix}_doc_idx.npy", np.arange(len(sizes), dtype=np.int32))
+    np.save(f"{prefix}_sample_idx.npy", np.asarray(sample_idx, dtype=np.int32))
+    np.save(f"{prefix}_shuffle_idx.npy", np.asarray(shuffle_idx, dtype=np.uint32))
+
+    ds = WriteableMMapIndexedDataset.__new__(WriteableMMapIndexedDataset)
+    ds.corpus_pointer = open(str(bin_path), "r+b")
+    ds.corpus_index = NeoXIndex(sizes, dtype)
+    ds.corpus_dtype = dtype
+    ds.corpus_pointers = _index_pointers(ds.corpus_index)
+    ds.num_documents = len(sizes)
+    ds.batch_info = BatchInfo(prefix)
+    ds.train_seq_len = 3
+    ds.add_extra_token_to_seq = 1
+    return ds, tokens
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    """A four-document corpus whose tokens are 0..17, read as shuffled samples of 3 (+1 extra) tokens."""
+    # Sample i holds tokens[3 * i:3 * i + 4]; samples 1 and 2 each span two documents
+    ds, tokens = build_dataset(tmp_path, [5, 3, 6, 4], [[0, 0], [0, 3], [1, 1], [2, 1]], [2, 0, 1])
+    yield ds, tokens
+    ds.close()
+
+
+def packed_sample_idx(sizes, num_samples, seq_len=3):
+    """The sample index of a run that packs the corpus into consecutive samples of seq_len (+1 extra) tokens."""
+    doc_starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+    positions = np.arange(num_samples + 1) * seq_len
+    docs = np.searchsorted(doc_starts, positions, side="right") - 1
+    return np.stack([docs, positions - doc_starts[docs]], axis=1)
+
+
+class WordTokenizer:
+    """Decodes every token id to its decimal string, counting the calls it receives."""
+
+    def __init__(self):
+        self.decode_calls = 0
+        self.batch_decode_calls = []
+
+    def decode(self, tokens):
+        self.decode_calls += 1
+        return " ".join(str(token) for token in np.asarray(tokens).tolist())
+
+    def batch_decode(self, token_arrays):
+        self.batch_decode_calls.append(len(token_arrays))
+        return [" ".join(str(token) for token in np.asarray(tokens).tolist()) for tokens in token_arrays]
+
+
+@pytest.fixture
+def manager(tmp_path):
+    """A DatasetManager over a three-document corpus packed into 52 shuffled samples, without GPT-NeoX's megatron package."""
+    from tokensmith import DatasetManager
+    from tokensmith.export import ExportHandler
+    from tokensmith.sample import SampleHandler
+
+    sizes = [100, 7, 50]
+    num_samples = 52
+    shuffle_idx = np.random.default_rng(0).permutation(num_samples)
+    ds, tokens = build_dataset(tmp_path, sizes, packed_sample_idx(sizes, num_samples), shuffle_idx)
+
+    dataset_manager = DatasetManager()
+    dataset_manager.WriteableMMapIndexedDataset = ds
+    dataset_manager.sample = SampleHandler(dataset_manager)
+    dataset_manager.export = ExportHandler(dataset_manager)
+    yield dataset_manager
+    ds.close()
@@ -0,0 +1,163 @@
+import numpy as np
+import pytest
+
+from tokensmith.export import handler as export_handler
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_csv_token_content_matches_str_of_list(monkeypatch, use_orjson):
+    if not use_orjson:
+        monkeypatch.setattr(export_handler, "orjson", None)
+    elif export_handler.orjson is None:
+        pytest.skip("orjson is not installed")
+
+    segments = [np.array([1, 2], dtype=np.uint16), np.array([65535], dtype=np.uint16)]
+    assert export_handler._csv_content(segments) == "[1, 2, 65535]"
+    assert export_handler._csv_content(np.array([], dtype=np.uint32)) == "[]"
+    assert export_handler._csv_content("some text") == "some text"
+
+
+def _write_csv(path, samples, csv_engine, include_doc_details=False):
+    with export_handler._open_export_file(str(path), True, export_handler._WRITE_BUFFER_SIZE) as f:
+        export_handler.ExportHandler(None)._write_chunk_to_csv(
+            samples, f, include_doc_details, 0, csv_engine=csv_engine, detokenized=isinstance(samples[0], str))
+    return path.read_bytes()
+
+
+@pytest.mark.parametrize("samples", [
+    ["plain", 'with "quotes", commas\nand newlines', "ünïcode"],
+    [[np.array([1, 2], dtype=np.uint16)], [np.array([3], dtype=np.uint16), np.array([4, 5], dtype=np.uint16)]],
+])
+def test_csv_engines_write_the_same_rows(tmp_path, samples):
+    pytest.importorskip("pyarrow")
+    import csv
+    import io
+
+    python_bytes = _write_csv(tmp_path / "python.csv", samples, "python")
+    pyarrow_bytes = _write_csv(tmp_path / "pyarrow.csv", samples, "pyarrow")
+
+    # The header goes through pyarrow as well, so the file uses one terminator and quoting style throughout
+    assert pyarrow_bytes.startswith(b'"index","content"\n')
+    assert b"\r\n" not in pyarrow_bytes
+    assert python_bytes.startswith(b"index,content\r\n")
+
+    def rows(data):
+        return list(csv.reader(io.StringIO(data.decode("utf-8"), newline="")))
+
+    assert rows(pyarrow_bytes) == rows(python_bytes)
+
+
+def test_pyarrow_csv_without_rows_still_writes_the_header(tmp_path):
+    pytest.importorskip("pyarrow")
+    path = tmp_path / "empty.csv"
+    with export_handler._open_export_file(str(path), True, export_handler._WRITE_BUFFER_SIZE) as f:
+        export_handler.ExportHandler(None)._write_chunk_to_csv([], f, False, 0, csv_engine="pyarrow")
+    assert path.read_bytes() == b'"index","content"\n'
+
+
+class _Unreachable:
+    """A manager stand-in that fails the test if an export gets past validation."""
+
+    def __getattr__(self, name):
+        raise AssertionError(f"export used the manager ({name}) despite invalid arguments")
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"csv_engine": "excel"},
+    {"num_workers": 0},
+    {"format_type": "parquet", "num_workers": 2},
+])
+def test_invalid_export_args_leave_no_directories(tmp_path, kwargs):
+    output_path = tmp_path / "missing" / "out.jsonl"
+    kwargs = {"format_type": "csv" if "csv_engine" in kwargs else "jsonl", "return_detokenized": False, **kwargs}
+    with pytest.raises(ValueError):
+        export_handler.ExportHandler(_Unreachable()).export_dataset_range(0, 10, str(output_path), **kwargs)
+    assert not output_path.parent.exists()
+
+
+def test_range_exports_validate_once(monkeypatch):
+    calls = []
+    handler = export_handler.ExportHandler(None)
+    monkeypatch.setattr(export_handler.ExportHandler.export_sequences, "__wrapped__",
+                        lambda self, **kwargs: calls.append(kwargs))
+    handler.export_sequence_range(0, 3, "out.jsonl", return_detokenized=False)
+    assert [call["sequence_indices"] for call in calls] == [[0, 1, 2]]
+
+
+def _export(manager, tmp_path, name, **kwargs):
+    output_path = tmp_path / name
+    manager.export.export_entire_dataset(str(output_path), chunk_size=8, **kwargs)
+    if kwargs.get("compression") == "gzip":
+        import gzip
+        return gzip.decompress((tmp_path / f"{name}.gz").read_bytes())
+    return output_path.read_bytes()
+
+
+def _expected_tokens(manager, loc):
+    shuffle_idx = manager.WriteableMMapIndexedDataset.batch_info.shuffle_idx
+    return list(range(3 * int(shuffle_idx[loc]), 3 * int(shuffle_idx[loc]) + 4))
+
+
+@pytest.mark.parametrize("format_type", ["jsonl", "csv"])
+@pytest.mark.parametrize("return_detokenized", [False, True])
+@pytest.mark.parametrize("compression", [None, "gzip"])
+def test_worker_exports_match_single_process_byte_for_byte(manager, tmp_path, format_type, return_detokenized,
+                                                           compression):
+    from conftest import WordTokenizer
+
+    kwargs = {"format_type": format_type, "return_detokenized": return_detokenized, "compression": compression,
+              "tokenizer": WordTokenizer() if return_detokenized else None}
+    single = _export(manager, tmp_path, f"single.{format_type}", num_workers=1, **kwargs)
+    sharded = _export(manager, tmp_path, f"sharded.{format_type}", num_workers=3, **kwargs)
+    assert single == sharded
+    # No shard files are left next to the output
+    assert sorted(p.name for p in tmp_path.iterdir() if p.name.startswith("sharded")) == \
+        [f"sharded.{format_type}" + (".gz" if compression else "")]
+
+
+def test_jsonl_export_contents(manager, tmp_path):
+    import json
+
+    records = [json.loads(line) for line in _export(manager, tmp_path, "out.jsonl", return_detokenized=False,
+                                                    num_workers=2).splitlines()]
+    assert [record["index"] for record in records] == list(range(52))
+    for loc, record in enumerate(records):
+        assert record["content"] == _expected_tokens(manager, loc)
+
+
+@pytest.mark.parametrize("return_detokenized", [False, True])
+def test_jsonl_export_is_the_same_with_and_without_orjson(manager, tmp_path, monkeypatch, return_detokenized):
+    if export_handler.orjson is None:
+        pytest.skip("orjson is not installed")
+    from conftest import WordTokenizer
+
+    kwargs = {"return_detokenized": return_detokenized, "tokenizer": WordTokenizer() if return_detokenized else None,
+              "include_doc_details": True}
+    with_orjson = _export(manager, tmp_path, "orjson.jsonl", **kwargs)
+    monkeypatch.setattr(export_handler, "orjson", None)
+    without_orjson = _export(manager, tmp_path, "json.jsonl", **kwargs)
+    assert with_orjson == without_orjson
+
+
+@pytest.mark.parametrize("num_workers", [1, 2])
+@pytest.mark.parametrize("return_detokenized", [False, True])
+def test_csv_export_engines_write_the_same_rows(manager, tmp_path, num_workers, return_detokenized):
+    pytest.importorskip("pyarrow")
+    import csv
+    import io
+    from conftest import WordTokenizer
+
+    kwargs = {"format_type": "csv", "return_detokenized": return_detokenized, "num_workers": num_workers,
+              "tokenizer": WordTokenizer() if return_detokenized else None}
+    python_bytes = _export(manager, tmp_path, "python.csv", csv_engine="python", **kwargs)
+    pyarrow_bytes = _export(manager, tmp_path, "pyarrow.csv", csv_engine="pyarrow", **kwargs)
+
+    def rows(data):
+        return list(csv.reader(io.StringIO(data.decode("utf-8"), newline="")))
+
+    python_rows = rows(python_bytes)
+    assert python_rows == rows(pyarrow_bytes)
+    # One header, however many workers wrote shards
+    assert python_rows[0] == ["index", "content"] and len(python_rows) == 53
+    expected = _expected_tokens(manager, 51)
+    assert python_rows[-1][1] == (" ".join(map(str, expected)) if return_detokenized else str(expected))
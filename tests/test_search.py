@@ -0,0 +1,26 @@
+import numpy as np
+import pytest
+
+from tokensmith.search.handler import _is_integer_array, _validate_queries, _validate_query
+
+
+@pytest.mark.parametrize("tokens", [[1, 2, 3], [True, 0], [2**70, 1]])
+def test_integer_lists_are_accepted(tokens):
+    assert _is_integer_array(tokens)
+
+
+@pytest.mark.parametrize("tokens", [[[1], [2]], [[1, 2]], [[1], [2, 3]], [1, 2.0], [1, "2"]])
+def test_non_integer_lists_are_rejected(tokens):
+    assert not _is_integer_array(tokens)
+
+
+def test_validate_query_rejects_nested_lists():
+    with pytest.raises(ValueError):
+        _validate_query([[1], [2]])
+    assert _validate_query(np.array([1, 2], dtype=np.uint16)) == [1, 2]
+
+
+def test_validate_queries_rejects_nested_lists():
+    with pytest.raises(ValueError):
+        _validate_queries([[[1], [2]], [3]])
+    assert _validate_queries([[1, 2], np.array([3], dtype=np.int64)]) == [[1, 2], [3]]
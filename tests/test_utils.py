@@ -0,0 +1,102 @@
+import multiprocessing
+
+import numpy as np
+
+from tokensmith import utils
+from tokensmith.utils import _index_pointers
+
+from conftest import NeoXIndex
+
+
+class IndexWithoutPointers:
+    """An index that only exposes its offsets through `__getitem__`."""
+
+    def __init__(self, sizes, dtype):
+        self.dtype = dtype
+        self.sizes = np.asarray(sizes, dtype=np.int32)
+        self._offsets = np.concatenate(([0], np.cumsum(self.sizes[:-1], dtype=np.int64))) * np.dtype(dtype).itemsize
+
+    def __getitem__(self, i):
+        return self._offsets[i], self.sizes[i]
+
+    def __len__(self):
+        return len(self.sizes)
+
+
+def _sample_tokens(tokens, sample):
+    return tokens[3 * sample:3 * sample + 4]
+
+
+def test_index_pointers_without_public_attribute():
+    index = NeoXIndex([5, 3, 6, 4], np.uint16)
+    assert not hasattr(index, "pointers")
+    np.testing.assert_array_equal(_index_pointers(index), [0, 10, 16, 28])
+
+
+def test_index_pointers_from_getitem():
+    index = IndexWithoutPointers([5, 3, 6, 4], np.uint16)
+    assert not hasattr(index, "pointers") and not hasattr(index, "_pointers")
+    np.testing.assert_array_equal(_index_pointers(index), [0, 10, 16, 28])
+
+
+def test_batched_reads_with_neox_index(dataset):
+    ds, tokens = dataset
+    shuffle_idx = [2, 0, 1]
+    for loc, sample in enumerate(shuffle_idx):
+        np.testing.assert_array_equal(np.concatenate(ds.get_example_by_id(loc)), _sample_tokens(tokens, sample))
+
+    for loc, example in enumerate(ds.get_examples_by_range(0, 3)):
+        np.testing.assert_array_equal(np.concatenate(example), _sample_tokens(tokens, shuffle_idx[loc]))
+
+    for loc, example in zip([1, 2, 0], ds.get_examples_by_ids([1, 2, 0])):
+        np.testing.assert_array_equal(np.concatenate(example), _sample_tokens(tokens, shuffle_idx[loc]))
+
+
+def test_prefetch_examples_with_neox_index(dataset, monkeypatch):
+    ds, _ = dataset
+    hints = []
+    monkeypatch.setattr(ds, "prefetch", lambda start, length: hints.append((start, length)))
+    monkeypatch.setattr("os.posix_fadvise", lambda *args: None, raising=False)
+
+    ds.prefetch_examples([0, 1, 2])
+
+    # The three samples cover tokens 0..9 of the corpus, which merge into one run of bytes
+    assert hints == [(0, 10 * np.dtype(np.uint16).itemsize)]
+
+
+def _read_in_child():
+    # Exits non-zero instead of hanging if the inherited pool has no threads to run the read
+    assert utils._get_read_pool().submit(int, "1").result(timeout=10) == 1
+
+
+def test_read_pool_is_recreated_after_fork():
+    parent_pool = utils._get_read_pool()
+    assert parent_pool.submit(int, "1").result() == 1
+
+    child = multiprocessing.get_context("fork").Process(target=_read_in_child)
+    child.start()
+    child.join(timeout=30)
+    if child.is_alive():
+        child.kill()
+    assert child.exitcode == 0
+    assert utils._get_read_pool() is parent_pool
+
+
+def test_decode_cache_decodes_each_distinct_sample_once():
+    import gc
+    from conftest import WordTokenizer
+
+    tokenizer = WordTokenizer()
+    a = [np.array([1, 2], dtype=np.uint16), np.array([3], dtype=np.uint16)]
+    b = [np.array([4, 5, 6], dtype=np.uint16)]
+    assert utils.generate_training_samples([a, b], tokenizer) == ["1 2 3", "4 5 6"]
+    # Both misses are decoded in one batch, and later lookups of either sample hit the cache
+    assert tokenizer.batch_decode_calls == [2]
+    assert utils.generate_training_samples([b, a], tokenizer) == ["4 5 6", "1 2 3"]
+    assert utils.decode_cached(np.array([4, 5, 6], dtype=np.uint16), tokenizer) == "4 5 6"
+    assert tokenizer.batch_decode_calls == [2] and tokenizer.decode_calls == 0
+
+    assert tokenizer in utils._decode_caches
+    del tokenizer
+    gc.collect()
+    assert len(utils._decode_caches) == 0
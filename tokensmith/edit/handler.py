@@ -3,7 +3,7 @@ from typing import TYPE_CHECKING, Union, List, Dict, Tuple, Optional, Any, Liter
 import numpy as np
 import warnings
 import logging
-from ..utils import generate_training_sample
+from ..utils import concat_segments, decode_cached
 
 try:
     from transformers import AutoTokenizer
@@ -15,9 +15,25 @@ logger = logging.getLogger(__name__)
 if TYPE_CHECKING:
     from ..manager import DatasetManager  # only used for type hints, won't cause import loop
 
+def _maybe_tolist(arr: np.ndarray, as_python: bool = True) -> Union[np.ndarray, List[int]]:
+    return arr.tolist() if as_python else arr
+
 class EditHandler:
+    __slots__ = ("manager", "_probed_tokenizer", "_tok_has_decode", "_tok_eos")
+
     def __init__(self, manager: 'DatasetManager'):
         self.manager = manager
+        # Tokenizer capabilities, probed once per tokenizer object (see _probe_tokenizer)
+        self._probed_tokenizer = None
+        self._tok_has_decode = False
+        self._tok_eos = None
+
+    def _probe_tokenizer(self, tokenizer: Any) -> None:
+        """Caches whether `tokenizer` can decode and its EOS token id, re-probing only when a different tokenizer is passed."""
+        if tokenizer is not self._probed_tokenizer:
+            self._probed_tokenizer = tokenizer
+            self._tok_has_decode = hasattr(tokenizer, 'decode')
+            self._tok_eos = getattr(tokenizer, 'eos_token_id', None)
 
     def inject_and_preview(
         self,
@@ -28,7 +44,9 @@ class EditHandler:
         rng: Optional[np.random.Generator] = None,
         add_eos_token: bool = True,
         dry_run: bool = True,
-        return_details: bool = False
+        return_details: bool = False,
+        python_lists: bool = True,
+        verbose: bool = True
     ) -> Union[None, Dict[str, Any]]:
         """
         Injects a dummy sequence into the dataset at a given location and prints before/after samples.
@@ -42,6 +60,10 @@ class EditHandler:
             add_eos_token (bool): Whether to add EOS token to the injected text.
             dry_run (bool): If True, no actual injection is performed.
             return_details (bool): If True, returns structured data instead of just printing.
+            python_lists (bool): If True, token arrays in the returned details are converted to Python lists (defaults to True).
+                Set it to False to get numpy arrays instead, which avoids boxing every token.
+            verbose (bool): If True (and return_details is False), prints the samples before and after the injection.
+                If both are False, the samples are neither read back nor decoded and only the injection is performed.
 
         Raises:
             ValueError: If injection_loc is negative, injection_type is invalid, or tokenizer is None.
@@ -50,7 +72,23 @@ class EditHandler:
             None: If return_details is False (default behavior with printing).
             Dict[str, Any]: If return_details is True, returns structured data with original and modified samples.
         """
-        # Input validation
+        self._validate_injection(text, tokenizer, injection_loc, injection_type)
+        dummy_sample = self._prepare_tokens(text, tokenizer, add_eos_token)
+        return self._apply_injection(
+            text=text,
+            dummy_sample=dummy_sample,
+            tokenizer=tokenizer,
+            injection_loc=injection_loc,
+            injection_type=injection_type,
+            rng=rng,
+            dry_run=dry_run,
+            return_details=return_details,
+            python_lists=python_lists,
+            verbose=verbose
+        )
+
+    def _validate_injection(self, text: str, tokenizer: Optional[Any], injection_loc: int, injection_type: str) -> None:
+        """Validates the arguments of a single injection, raising ValueError on bad input."""
         if not isinstance(text, str):
             raise ValueError("text must be a string.")
         if tokenizer is None:
@@ -60,27 +98,79 @@ class EditHandler:
         if injection_type not in ("seq_shuffle", "seq_start"):
             raise ValueError("injection_type must be 'seq_shuffle' or 'seq_start'.")
 
-        # Tokenize the input text
-        try:
-            dummy_sample = np.array(tokenizer(text)["input_ids"])
-        except Exception as e:
-            raise ValueError(f"Failed to tokenize input text: {e}")
+    def _prepare_tokens(
+        self,
+        text: str,
+        tokenizer: Any,
+        add_eos_token: bool,
+        input_ids: Optional[List[int]] = None
+    ) -> np.ndarray:
+        """Tokenizes `text` (unless pre-tokenized `input_ids` are given) and appends the EOS token if requested."""
+        if input_ids is None:
+            try:
+                # Only the ids are used, so skip building the attention mask
+                input_ids = tokenizer(text, return_attention_mask=False)["input_ids"]
+            except Exception as e:
+                raise ValueError(f"Failed to tokenize input text: {e}")
+        num_tokens = len(input_ids)
+        self._probe_tokenizer(tokenizer)
 
         # Add EOS token if requested
-        if add_eos_token and hasattr(tokenizer, 'eos_token_id') and tokenizer.eos_token_id is not None:
-            if len(dummy_sample) > 0 and dummy_sample[-1] == tokenizer.eos_token_id:
+        append_eos = False
+        if add_eos_token and self._tok_eos is not None:
+            if num_tokens > 0 and input_ids[-1] == self._tok_eos:
                 warnings.warn("The injected sample already contains the EOS token.")
             else:
-                dummy_sample = np.append(dummy_sample, tokenizer.eos_token_id)
+                append_eos = True
         elif add_eos_token:
             warnings.warn("Tokenizer does not have an EOS token, skipping EOS token addition.")
-        
-        if not return_details:
-            print(f"Dummy sample: {dummy_sample}")
 
+        # Allocate the final size up front, directly in the corpus dtype so the
+        # injection does not need to cast (and copy) the sample again
+        dummy_sample = np.empty(num_tokens + append_eos, dtype=self.manager.WriteableMMapIndexedDataset.corpus_dtype)
+        dummy_sample[:num_tokens] = input_ids
+        if append_eos:
+            dummy_sample[num_tokens] = self._tok_eos
+
+        return dummy_sample
+
+    def _apply_injection(
+        self,
+        text: str,
+        dummy_sample: np.ndarray,
+        tokenizer: Any,
+        injection_loc: int,
+        injection_type: str,
+        rng: Optional[np.random.Generator],
+        dry_run: bool,
+        return_details: bool,
+        python_lists: bool = True,
+        verbose: bool = True
+    ) -> Union[None, Dict[str, Any]]:
+        """Injects the already tokenized `dummy_sample` and previews the sample before and after."""
         rng = rng or np.random.default_rng(1234)
         dataset = self.manager.WriteableMMapIndexedDataset
 
+        verbose = verbose and not return_details
+        if not verbose and not return_details:
+            # Nobody looks at the preview, so skip reading and decoding the sample
+            try:
+                dataset.inject_example_into_corpus(
+                    injection_loc=injection_loc,
+                    injection_data=dummy_sample,
+                    injection_type=injection_type,
+                    rng=rng,
+                    dry_run=dry_run
+                )
+            except Exception as e:
+                raise ValueError(f"Failed to inject sample: {e}")
+            return None
+
+        if verbose:
+            print(f"Dummy sample: {dummy_sample}")
+
+        self._probe_tokenizer(tokenizer)
+
         # Get original sample
         try:
             orig_sample = dataset.get_example_by_id(
@@ -89,10 +179,10 @@ class EditHandler:
         except Exception as e:
             raise ValueError(f"Failed to retrieve sample at location {injection_loc}: {e}")
 
-        concat_orig_sample = np.concatenate(orig_sample)
-        orig_decoded = tokenizer.decode(concat_orig_sample) if hasattr(tokenizer, 'decode') else str(concat_orig_sample)
+        concat_orig_sample = concat_segments(orig_sample)
+        orig_decoded = decode_cached(concat_orig_sample, tokenizer) if self._tok_has_decode else str(concat_orig_sample)
 
-        if not return_details:
+        if verbose:
             print(f"Training sample {injection_loc}")
             print(f"Sample consists of segments from {len(orig_sample)} documents")
             print(f"Raw sample: {concat_orig_sample}")
@@ -100,30 +190,30 @@ class EditHandler:
             print(f"Decoded sample: {orig_decoded}")
             print("---")
 
-        # Perform injection
+        # Perform injection, reusing the sample read above and getting the modified sample
+        # back from the injection instead of reading it from the corpus again
         try:
-            injection_details = dataset.inject_example_into_corpus(
+            injection_details, edited_sample = dataset.inject_example_into_corpus(
                 injection_loc=injection_loc,
                 injection_data=dummy_sample,
                 injection_type=injection_type,
                 rng=rng,
-                dry_run=dry_run
+                dry_run=dry_run,
+                orig_example=orig_sample,
+                return_example=True
             )
         except Exception as e:
             raise ValueError(f"Failed to inject sample: {e}")
 
-        # Get modified sample
-        try:
-            edited_sample = dataset.get_example_by_id(
-                example_loc=injection_loc, return_doc_details=False
-            )
-        except Exception as e:
-            raise ValueError(f"Failed to retrieve modified sample: {e}")
-
-        concat_edited_sample = np.concatenate(edited_sample)
-        edited_decoded = tokenizer.decode(concat_edited_sample) if hasattr(tokenizer, 'decode') else str(concat_edited_sample)
+        # When only printing, the original tokens aren't needed anymore, so a sample of the same
+        # length is joined into the original's (writeable, already concatenated) buffer
+        out = None
+        if verbose and len(orig_sample) > 1 and sum(s.size for s in edited_sample) == concat_orig_sample.size:
+            out = concat_orig_sample
+        concat_edited_sample = concat_segments(edited_sample, out=out)
+        edited_decoded = decode_cached(concat_edited_sample, tokenizer) if self._tok_has_decode else str(concat_edited_sample)
 
-        if not return_details:
+        if verbose:
             print(f"Training sample {injection_loc} after injection")
             print(f"Raw sample: {concat_edited_sample}")
             print("---")
@@ -135,14 +225,14 @@ class EditHandler:
                 "injection_type": injection_type,
                 "dry_run": dry_run,
                 "injected_text": text,
-                "injected_tokens": dummy_sample.tolist(),
+                "injected_tokens": _maybe_tolist(dummy_sample, python_lists),
                 "original_sample": {
-                    "raw_tokens": concat_orig_sample.tolist(),
+                    "raw_tokens": _maybe_tolist(concat_orig_sample, python_lists),
                     "decoded_text": orig_decoded,
                     "num_documents": len(orig_sample)
                 },
                 "modified_sample": {
-                    "raw_tokens": concat_edited_sample.tolist(),
+                    "raw_tokens": _maybe_tolist(concat_edited_sample, python_lists),
                     "decoded_text": edited_decoded,
                     "num_documents": len(edited_sample)
                 },
@@ -156,7 +246,8 @@ class EditHandler:
         rng: Optional[np.random.Generator] = None,
         add_eos_token: bool = True,
         dry_run: bool = True,
-        return_details: bool = False
+        return_details: bool = False,
+        python_lists: bool = True
     ) -> Union[None, List[Dict[str, Any]]]:
         """
         Inject multiple samples into the dataset in batch.
@@ -167,10 +258,12 @@ class EditHandler:
                 - injection_loc (int): Location to inject
                 - injection_type (str, optional): Type of injection, defaults to "seq_shuffle"
             tokenizer: A HuggingFace-compatible tokenizer.
-            rng (np.random.Generator, optional): RNG for reproducibility.
+            rng (np.random.Generator, optional): RNG for reproducibility, shared by all injections. If None, uses np.random.default_rng() with seed 1234.
             add_eos_token (bool): Whether to add EOS token to injected text.
             dry_run (bool): If True, no actual injection is performed.
             return_details (bool): If True, returns structured data for all injections.
+            python_lists (bool): If True, token arrays in the returned details are converted to Python lists (defaults to True).
+                Set it to False to get numpy arrays instead, which avoids boxing every token.
 
         Raises:
             ValueError: If injections list is invalid or any injection specification is invalid.
@@ -186,26 +279,52 @@ class EditHandler:
         if tokenizer is None:
             raise ValueError("tokenizer must be provided.")
 
-        results = []
         for i, injection in enumerate(injections):
             if not isinstance(injection, dict):
                 raise ValueError(f"Injection {i} must be a dictionary.")
             
             if "text" not in injection or "injection_loc" not in injection:
                 raise ValueError(f"Injection {i} must contain 'text' and 'injection_loc' keys.")
-            
+
+        # Tokenize all texts in a single tokenizer call. If that is not possible
+        # (non-string text or a tokenizer without batch support), each injection
+        # is tokenized on its own below.
+        texts = [injection["text"] for injection in injections]
+        batch_input_ids = None
+        if all(isinstance(text, str) for text in texts):
+            try:
+                batch_input_ids = tokenizer(texts, return_attention_mask=False)["input_ids"]
+            except Exception as e:
+                logger.debug(f"Batch tokenization failed, tokenizing injections individually: {e}")
+
+        # Create the fallback RNG once so that injections draw from a single stream
+        # instead of each re-seeding a fresh generator
+        if rng is None:
+            rng = np.random.default_rng(1234)
+
+        results = []
+        for i, injection in enumerate(injections):
             injection_type = injection.get("injection_type", "seq_shuffle")
             
             try:
-                result = self.inject_and_preview(
+                self._validate_injection(injection["text"], tokenizer, injection["injection_loc"], injection_type)
+                dummy_sample = self._prepare_tokens(
+                    injection["text"],
+                    tokenizer,
+                    add_eos_token,
+                    input_ids=batch_input_ids[i] if batch_input_ids is not None else None
+                )
+                result = self._apply_injection(
                     text=injection["text"],
+                    dummy_sample=dummy_sample,
                     tokenizer=tokenizer,
                     injection_loc=injection["injection_loc"],
                     injection_type=injection_type,
                     rng=rng,
-                    add_eos_token=add_eos_token,
                     dry_run=dry_run,
-                    return_details=True
+                    return_details=return_details,
+                    python_lists=python_lists,
+                    verbose=False
                 )
                 
                 if return_details:
@@ -264,7 +383,7 @@ class EditHandler:
             doc_details = None
 
         if return_detokenized:
-            output_seq = generate_training_sample(output_seq, tokenizer)
+            output_seq = decode_cached(concat_segments(output_seq), tokenizer)
 
         if return_doc_details:
             return output_seq, doc_details
@@ -285,7 +404,7 @@ class EditHandler:
             return False
         
         try:
-            return injection_loc < self.WriteableMMapIndexedDataset.num_samples
+            return injection_loc < self.manager.WriteableMMapIndexedDataset.num_samples
         except Exception:
             return False
 
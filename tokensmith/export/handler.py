@@ -1,16 +1,327 @@
-from typing import TYPE_CHECKING, List, Union, Optional, Any, Dict
+from typing import TYPE_CHECKING, List, Union, Optional, Any, Dict, Iterable, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from itertools import chain
+import functools
+import gzip
+import inspect
+import io
+import multiprocessing
 import json
-import csv
 import os
+import re
+import shutil
 from pathlib import Path
+import numpy as np
+from ..utils import concat_segments
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import zstandard as zstd
+except ImportError:
+    zstd = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pacsv = None
+    pq = None
 
 if TYPE_CHECKING:
     from ..manager import DatasetManager  # only used for type hints, won't cause import loop
 
+# Default size of the write buffer for export files
+_WRITE_BUFFER_SIZE = 1 << 20
+# Number of serialized JSONL lines / CSV rows handed to the file per write call
+_LINES_PER_WRITE = 1024
+# Maximum number of buffers the kernel accepts in a single writev call
+try:
+    _IOV_MAX = max(os.sysconf("SC_IOV_MAX"), 1)
+except (AttributeError, ValueError, OSError):
+    _IOV_MAX = 1024
+# Number of samples written per Parquet row group
+_PARQUET_ROWS_PER_GROUP = 8192
+# Buffer size used when concatenating shard files written by export workers
+_SHARD_COPY_BUFFER_SIZE = 4 << 20
+
+# Set in each export worker process by _init_export_worker
+_worker_manager: Optional['DatasetManager'] = None
+_worker_tokenizer: Optional[Any] = None
+
+def _init_export_worker(manager: 'DatasetManager', tokenizer: Optional[Any]) -> None:
+    """Initializer for forked export workers."""
+    global _worker_manager, _worker_tokenizer
+    dataset = manager.WriteableMMapIndexedDataset
+    # Forked workers share the parent's file offset, so each one reads through its own handle
+    dataset.corpus_pointer = open(dataset.corpus_pointer.name, 'rb')
+    _worker_manager = manager
+    _worker_tokenizer = tokenizer
+
+def _export_shard(start_idx: int, end_idx: int, shard_path: str, format_type: str, return_detokenized: bool,
+                  include_doc_details: bool, chunk_size: int, buffer_size: int, write_header: bool,
+                  preallocate: bool, csv_engine: str, compression: Optional[str]) -> None:
+    """Exports samples [start_idx, end_idx) to shard_path inside an export worker."""
+    _worker_manager.export._stream_range_to_file(
+        start_idx=start_idx,
+        end_idx=end_idx,
+        output_path=shard_path,
+        format_type=format_type,
+        return_detokenized=return_detokenized,
+        tokenizer=_worker_tokenizer,
+        include_doc_details=include_doc_details,
+        chunk_size=chunk_size,
+        buffer_size=buffer_size,
+        write_header=write_header,
+        preallocate=preallocate,
+        csv_engine=csv_engine,
+        compression=compression
+    )
+
+def _preallocate(file_handle, records_written: int, expected_records: int) -> None:
+    """
+    Reserves the estimated final size of an export file, extrapolated from the records written so far,
+    so the filesystem can allocate it in a few large extents. The file is truncated to its actual size
+    once writing is done.
+    """
+    if not hasattr(os, 'posix_fallocate') or records_written >= expected_records:
+        return
+    written = file_handle.tell()
+    estimate = written * expected_records // records_written
+    file_handle.flush()
+    try:
+        os.posix_fallocate(file_handle.fileno(), written, estimate - written)
+    except OSError:
+        # Not supported by the filesystem, the file just grows as it is written
+        pass
+
+def _json_default(obj: Any) -> Any:
+    if isinstance(obj, (np.ndarray, np.generic)):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def _dumps_jsonl(record: Dict[str, Any]) -> bytes:
+    """
+    Serializes a record to a newline-terminated UTF-8 JSON line, handling numpy arrays and scalars natively.
+    The json fallback uses orjson's compact separators, so the output bytes do not depend on whether orjson is installed.
+    """
+    if orjson is not None:
+        return orjson.dumps(record, default=_json_default, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(record, ensure_ascii=False, separators=(',', ':'), default=_json_default) + '\n').encode('utf-8')
+
+def _ensure_parent(output_path: str) -> None:
+    """Creates the parent directory of output_path if needed. Bare filenames have no directory to create."""
+    parent = os.path.dirname(output_path)
+    if parent and not os.path.isdir(parent):
+        os.makedirs(parent, exist_ok=True)
+
+# File suffix appended to output paths for each supported compression
+_COMPRESSION_SUFFIXES = {None: "", "gzip": ".gz", "zstd": ".zst"}
+
+def _with_compression_suffix(output_path: str, compression: Optional[str]) -> str:
+    suffix = _COMPRESSION_SUFFIXES[compression]
+    if suffix and not output_path.endswith(suffix):
+        return output_path + suffix
+    return output_path
+
+@contextmanager
+def _open_export_file(output_path: str, text: bool, buffer_size: int, compression: Optional[str] = None):
+    """Opens an export file for writing in binary or text mode (UTF-8, no newline translation), optionally compressed."""
+    if compression is None:
+        if text:
+            f = open(output_path, 'w', newline='', encoding='utf-8', buffering=buffer_size)
+        else:
+            f = open(output_path, 'wb', buffering=buffer_size)
+        with f:
+            yield f
+        return
+
+    with open(output_path, 'wb', buffering=buffer_size) as raw:
+        if compression == "gzip":
+            # Level 1 keeps compression from becoming the bottleneck of the export
+            stream = gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=1)
+        else:
+            stream = zstd.ZstdCompressor(level=3, threads=-1).stream_writer(raw)
+        if text:
+            stream = io.TextIOWrapper(stream, encoding='utf-8', newline='')
+        with stream:
+            yield stream
+
+def _write_lines(file_handle, lines: List[bytes]) -> None:
+    """
+    Writes serialized lines to a binary file. Where available, they are handed to the kernel with
+    scatter-gather writes (os.writev) instead of first being joined into one buffer.
+    """
+    # Compressed streams expose the underlying file descriptor, which must not be written to directly
+    if not hasattr(os, 'writev') or not isinstance(file_handle, (io.BufferedWriter, io.FileIO)):
+        file_handle.write(b''.join(lines))
+        return
+
+    # Anything still in the Python-side buffer has to land in the file first
+    file_handle.flush()
+    fd = file_handle.fileno()
+    pending = lines
+    while pending:
+        written = os.writev(fd, pending[:_IOV_MAX])
+        # Drop fully written lines and resume a partially written one where the kernel stopped
+        done = 0
+        while done < len(pending) and written >= len(pending[done]):
+            written -= len(pending[done])
+            done += 1
+        pending = pending[done:]
+        if written:
+            pending[0] = memoryview(pending[0])[written:]
+
+def _text_content(sample: str) -> str:
+    return sample
+
+def _sample_content(sample: Union[str, List[np.ndarray], np.ndarray]) -> Union[str, np.ndarray]:
+    """Returns detokenized text as-is, and token segments joined into a single array."""
+    if isinstance(sample, (str, np.ndarray)):
+        return sample
+    return concat_segments(sample)
+
+def _csv_content(sample: Union[str, List[np.ndarray], np.ndarray]) -> str:
+    """Returns detokenized text as-is, and token segments as the str() of their token list (e.g. "[1, 2, 3]")."""
+    content = _sample_content(sample)
+    if isinstance(content, str):
+        return content
+    if orjson is not None:
+        # Integer arrays contain no other commas, so widening orjson's separators gives exactly str(list)
+        return orjson.dumps(content, default=_json_default, option=orjson.OPT_SERIALIZE_NUMPY).replace(b',', b', ').decode('utf-8')
+    return str(content.tolist())
+
+# Characters that force a CSV field to be quoted (matches csv.QUOTE_MINIMAL with the default dialect)
+_CSV_NEEDS_QUOTING = re.compile(r'[,"\r\n]')
+
+def _csv_field(value: Any) -> str:
+    if value is None:
+        return ''
+    field = value if isinstance(value, str) else str(value)
+    if _CSV_NEEDS_QUOTING.search(field):
+        return '"' + field.replace('"', '""') + '"'
+    return field
+
+def _csv_row(fields: List[Any]) -> str:
+    """Formats a CSV row exactly as csv.writer does with the default dialect."""
+    return ','.join([_csv_field(field) for field in fields]) + '\r\n'
+
+def _parquet_table(indices: List[int], contents: List[Any], doc_details: List[Optional[Dict]],
+                   detail_names: List[str], detokenized: bool) -> 'pa.Table':
+    """
+    Builds an Arrow table from a batch of samples. Token arrays become a list column assembled
+    directly from the numpy buffers (one concatenation plus offsets) rather than Python lists.
+    """
+    columns = {"index": pa.array(indices, type=pa.int64())}
+    if detokenized:
+        columns["content"] = pa.array(contents, type=pa.string())
+    else:
+        token_arrays = [_sample_content(content) for content in contents]
+        offsets = np.zeros(len(token_arrays) + 1, dtype=np.int32)
+        np.cumsum([tokens.size for tokens in token_arrays], out=offsets[1:])
+        columns["content"] = pa.ListArray.from_arrays(pa.array(offsets), pa.array(np.concatenate(token_arrays)))
+    for name in detail_names:
+        columns[name] = pa.array([details.get(name) if details else None for details in doc_details])
+    return pa.table(columns)
+
+def _write_csv_rows(file_handle, rows: List[List[Any]], column_names: List[str], csv_engine: str,
+                    include_header: bool = False) -> None:
+    """
+    Writes rows to a text-mode CSV file, formatting them in Python or through pyarrow's C++ CSV writer.
+    If include_header is True, the header row is written first by the same engine, so the whole file
+    shares one line terminator and quoting style.
+    """
+    if csv_engine == "pyarrow":
+        if rows:
+            table = pa.table({name: list(column) for name, column in zip(column_names, zip(*rows))})
+        else:
+            table = pa.table({name: pa.array([], type=pa.string()) for name in column_names})
+        # pyarrow writes bytes, so go through the underlying binary buffer after flushing pending text
+        file_handle.flush()
+        pacsv.write_csv(table, file_handle.buffer, write_options=pacsv.WriteOptions(include_header=include_header))
+    else:
+        if include_header:
+            rows = [column_names, *rows]
+        file_handle.write(''.join([_csv_row(fields) for fields in rows]))
+
+def _validate_export_args(range_args: Optional[Tuple[str, str]] = None):
+    """
+    Decorator for the public export methods. Checks format_type, compression, num_workers and csv_engine
+    (where the method takes them) and that a tokenizer is given for detokenized exports, and if range_args
+    names a (start, end) pair of parameters, that they form a non-empty range of non-negative integers.
+    Everything is checked before the method runs, so invalid arguments never leave directories or files behind.
+    The undecorated method is available as `__wrapped__` for methods that delegate to another export method.
+    """
+    def decorator(fn):
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = bound.arguments
+
+            if arguments["format_type"] not in ["jsonl", "csv", "parquet"]:
+                raise ValueError("format_type must be 'jsonl', 'csv' or 'parquet'")
+
+            if arguments["format_type"] == "parquet":
+                if pq is None:
+                    raise ValueError("pyarrow must be installed to export to parquet")
+                if arguments["compression"] is not None:
+                    raise ValueError("compression is not supported for parquet, which is compressed internally (zstd)")
+
+            if arguments["return_detokenized"] and arguments["tokenizer"] is None:
+                raise ValueError("tokenizer must be provided if return_detokenized is True")
+
+            if arguments["compression"] not in _COMPRESSION_SUFFIXES:
+                raise ValueError("compression must be None, 'gzip' or 'zstd'")
+
+            if arguments["compression"] == "zstd" and zstd is None:
+                raise ValueError("zstandard must be installed to use compression='zstd'")
+
+            if "num_workers" in arguments:
+                num_workers = arguments["num_workers"]
+                if not isinstance(num_workers, int) or num_workers <= 0:
+                    raise ValueError("num_workers must be a positive integer")
+                if arguments["format_type"] == "parquet" and num_workers > 1:
+                    raise ValueError("num_workers > 1 is not supported for parquet exports")
+
+            if "csv_engine" in arguments:
+                if arguments["csv_engine"] not in ["python", "pyarrow"]:
+                    raise ValueError("csv_engine must be 'python' or 'pyarrow'")
+                if arguments["format_type"] == "csv" and arguments["csv_engine"] == "pyarrow" and pacsv is None:
+                    raise ValueError("pyarrow must be installed to use csv_engine='pyarrow'")
+
+            if range_args is not None:
+                start_name, end_name = range_args
+                start, end = arguments[start_name], arguments[end_name]
+
+                if not isinstance(start, int) or not isinstance(end, int):
+                    raise ValueError(f"{start_name} and {end_name} must be integers")
+
+                if start < 0 or end < 0:
+                    raise ValueError(f"{start_name} and {end_name} must be non-negative")
+
+                if start >= end:
+                    raise ValueError(f"{start_name} must be less than {end_name}")
+
+            return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
 class ExportHandler:
+    __slots__ = ("manager",)
+
     def __init__(self, manager: 'DatasetManager'):
         self.manager = manager
 
+    @_validate_export_args()
     def export_batches(
         self,
         batch_ids: List[int],
@@ -20,7 +331,9 @@ class ExportHandler:
         return_detokenized: bool = True,
         tokenizer: Optional[Any] = None,
         include_doc_details: bool = False,
-        flatten_batches: bool = False
+        flatten_batches: bool = False,
+        buffer_size: int = _WRITE_BUFFER_SIZE,
+        compression: Optional[str] = None
     ) -> None:
         """
         Export specific batches to a file.
@@ -29,20 +342,20 @@ class ExportHandler:
             batch_ids (List[int]): List of batch IDs to export.
             batch_size (int): The size of each batch.
             output_path (str): Path to the output file.
-            format_type (str): Format to export ("jsonl" or "csv").
+            format_type (str): Format to export ("jsonl", "csv" or "parquet", which requires pyarrow).
             return_detokenized (bool): If True, exports detokenized text; otherwise exports token arrays.
             tokenizer: The tokenizer to use for detokenization (required if return_detokenized is True).
             include_doc_details (bool): If True, includes document details in the export.
             flatten_batches (bool): If True, flattens all batches into a single list of samples.
+            buffer_size (int): Size in bytes of the output file write buffer (defaults to 1 MiB).
+            compression (Optional[str]): Compress the output with "gzip" or "zstd" (requires zstandard). The matching ".gz"/".zst" suffix is appended to output_path if missing (defaults to None, i.e. uncompressed).
 
         Raises:
-            ValueError: If format_type is not supported or tokenizer is None when return_detokenized is True.
+            ValueError: If format_type is not supported, tokenizer is None when return_detokenized is True,
+                       or format_type is "parquet" and flatten_batches is False.
         """
-        if format_type not in ["jsonl", "csv"]:
-            raise ValueError("format_type must be 'jsonl' or 'csv'")
-
-        if return_detokenized and tokenizer is None:
-            raise ValueError("tokenizer must be provided if return_detokenized is True")
+        if format_type == "parquet" and not flatten_batches:
+            raise ValueError("parquet exports require flatten_batches=True")
 
         # Get batches using the sample handler
         batches = self.manager.sample.get_batches_by_ids(
@@ -53,14 +366,22 @@ class ExportHandler:
             tokenizer=tokenizer
         )
 
+        output_path = _with_compression_suffix(output_path, compression)
+
         # Create output directory if it doesn't exist
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        _ensure_parent(output_path)
 
         if format_type == "jsonl":
-            self._export_to_jsonl(batches, output_path, flatten_batches, include_doc_details, "batch")
+            self._export_to_jsonl(batches, output_path, flatten_batches, include_doc_details, "batch", buffer_size, compression,
+                                  detokenized=return_detokenized and flatten_batches)
         elif format_type == "csv":
-            self._export_to_csv(batches, output_path, flatten_batches, include_doc_details, "batch")
+            self._export_to_csv(batches, output_path, flatten_batches, include_doc_details, "batch", buffer_size, compression,
+                                detokenized=return_detokenized and flatten_batches)
+        elif format_type == "parquet":
+            self._write_chunk_to_parquet(chain.from_iterable(batches), output_path, include_doc_details, 0,
+                                         detokenized=return_detokenized)
 
+    @_validate_export_args()
     def export_sequences(
         self,
         sequence_indices: List[int],
@@ -68,7 +389,9 @@ class ExportHandler:
         format_type: str = "jsonl",
         return_detokenized: bool = True,
         tokenizer: Optional[Any] = None,
-        include_doc_details: bool = False
+        include_doc_details: bool = False,
+        buffer_size: int = _WRITE_BUFFER_SIZE,
+        compression: Optional[str] = None
     ) -> None:
         """
         Export specific sequences to a file.
@@ -76,20 +399,16 @@ class ExportHandler:
         Parameters:
             sequence_indices (List[int]): List of sequence indices to export.
             output_path (str): Path to the output file.
-            format_type (str): Format to export ("jsonl" or "csv").
+            format_type (str): Format to export ("jsonl", "csv" or "parquet", which requires pyarrow).
             return_detokenized (bool): If True, exports detokenized text; otherwise exports token arrays.
             tokenizer: The tokenizer to use for detokenization (required if return_detokenized is True).
             include_doc_details (bool): If True, includes document details in the export.
+            buffer_size (int): Size in bytes of the output file write buffer (defaults to 1 MiB).
+            compression (Optional[str]): Compress the output with "gzip" or "zstd" (requires zstandard). The matching ".gz"/".zst" suffix is appended to output_path if missing (defaults to None, i.e. uncompressed).
 
         Raises:
             ValueError: If format_type is not supported or tokenizer is None when return_detokenized is True.
         """
-        if format_type not in ["jsonl", "csv"]:
-            raise ValueError("format_type must be 'jsonl' or 'csv'")
-
-        if return_detokenized and tokenizer is None:
-            raise ValueError("tokenizer must be provided if return_detokenized is True")
-
         # Get samples using the sample handler
         samples = self.manager.sample.get_samples_by_indices(
             indices=sequence_indices,
@@ -98,14 +417,21 @@ class ExportHandler:
             tokenizer=tokenizer
         )
 
+        output_path = _with_compression_suffix(output_path, compression)
+
         # Create output directory if it doesn't exist
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        _ensure_parent(output_path)
 
         if format_type == "jsonl":
-            self._export_to_jsonl([samples], output_path, True, include_doc_details, "sequence")
+            self._export_to_jsonl([samples], output_path, True, include_doc_details, "sequence", buffer_size, compression,
+                                  detokenized=return_detokenized)
         elif format_type == "csv":
-            self._export_to_csv([samples], output_path, True, include_doc_details, "sequence")
+            self._export_to_csv([samples], output_path, True, include_doc_details, "sequence", buffer_size, compression,
+                                detokenized=return_detokenized)
+        elif format_type == "parquet":
+            self._write_chunk_to_parquet(samples, output_path, include_doc_details, 0, detokenized=return_detokenized)
 
+    @_validate_export_args()
     def export_entire_dataset(
         self,
         output_path: str,
@@ -113,66 +439,57 @@ class ExportHandler:
         return_detokenized: bool = True,
         tokenizer: Optional[Any] = None,
         include_doc_details: bool = False,
-        chunk_size: int = 1000
+        chunk_size: int = 1000,
+        buffer_size: int = _WRITE_BUFFER_SIZE,
+        num_workers: int = 1,
+        preallocate: bool = False,
+        csv_engine: str = "python",
+        compression: Optional[str] = None
     ) -> None:
         """
         Export the entire dataset to a file.
 
         Parameters:
             output_path (str): Path to the output file.
-            format_type (str): Format to export ("jsonl" or "csv").
+            format_type (str): Format to export ("jsonl", "csv" or "parquet", which requires pyarrow).
             return_detokenized (bool): If True, exports detokenized text; otherwise exports token arrays.
             tokenizer: The tokenizer to use for detokenization (required if return_detokenized is True).
             include_doc_details (bool): If True, includes document details in the export.
             chunk_size (int): Number of samples to process at a time to manage memory usage.
+            buffer_size (int): Size in bytes of the output file write buffer (defaults to 1 MiB).
+            num_workers (int): Number of worker processes. Each exports a contiguous shard of the samples, and the shards are then concatenated into output_path (defaults to 1, i.e. no worker processes).
+            preallocate (bool): If True, reserves the estimated size of the output file on disk (via posix_fallocate, where available) to reduce fragmentation of large exports.
+            csv_engine (str): How CSV rows are formatted. "python" matches csv.writer output, "pyarrow" uses pyarrow's C++ CSV writer, which is faster but quotes every string field and uses \n line endings (requires pyarrow).
+            compression (Optional[str]): Compress the output with "gzip" or "zstd" (requires zstandard). The matching ".gz"/".zst" suffix is appended to output_path if missing (defaults to None, i.e. uncompressed).
 
         Raises:
             ValueError: If format_type is not supported or tokenizer is None when return_detokenized is True.
         """
-        if format_type not in ["jsonl", "csv"]:
-            raise ValueError("format_type must be 'jsonl' or 'csv'")
-
-        if return_detokenized and tokenizer is None:
-            raise ValueError("tokenizer must be provided if return_detokenized is True")
-
         # Get total number of samples
         total_samples = len(self.manager.WriteableMMapIndexedDataset.batch_info.shuffle_idx)
 
-        # Create output directory if it doesn't exist
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        output_path = _with_compression_suffix(output_path, compression)
 
-        # Export in chunks to manage memory
-        if format_type == "jsonl":
-            with open(output_path, 'w', encoding='utf-8') as f:
-                for start_idx in range(0, total_samples, chunk_size):
-                    end_idx = min(start_idx + chunk_size, total_samples)
-                    chunk_indices = list(range(start_idx, end_idx))
-                    
-                    chunk_samples = self.manager.sample.get_samples_by_indices(
-                        indices=chunk_indices,
-                        return_doc_details=include_doc_details,
-                        return_detokenized=return_detokenized,
-                        tokenizer=tokenizer
-                    )
-                    
-                    self._write_chunk_to_jsonl(chunk_samples, f, include_doc_details, start_idx)
+        # Create output directory if it doesn't exist
+        _ensure_parent(output_path)
 
-        elif format_type == "csv":
-            with open(output_path, 'w', newline='', encoding='utf-8') as f:
-                writer = None
-                for start_idx in range(0, total_samples, chunk_size):
-                    end_idx = min(start_idx + chunk_size, total_samples)
-                    chunk_indices = list(range(start_idx, end_idx))
-                    
-                    chunk_samples = self.manager.sample.get_samples_by_indices(
-                        indices=chunk_indices,
-                        return_doc_details=include_doc_details,
-                        return_detokenized=return_detokenized,
-                        tokenizer=tokenizer
-                    )
-                    
-                    writer = self._write_chunk_to_csv(chunk_samples, f, writer, include_doc_details, start_idx)
+        self._export_range(
+            start_idx=0,
+            end_idx=total_samples,
+            output_path=output_path,
+            format_type=format_type,
+            return_detokenized=return_detokenized,
+            tokenizer=tokenizer,
+            include_doc_details=include_doc_details,
+            chunk_size=chunk_size,
+            buffer_size=buffer_size,
+            num_workers=num_workers,
+            preallocate=preallocate,
+            csv_engine=csv_engine,
+            compression=compression
+        )
 
+    @_validate_export_args(range_args=("start_idx", "end_idx"))
     def export_sequence_range(
         self,
         start_idx: int,
@@ -181,7 +498,9 @@ class ExportHandler:
         format_type: str = "jsonl",
         return_detokenized: bool = True,
         tokenizer: Optional[Any] = None,
-        include_doc_details: bool = False
+        include_doc_details: bool = False,
+        buffer_size: int = _WRITE_BUFFER_SIZE,
+        compression: Optional[str] = None
     ) -> None:
         """
         Export a range of sequences to a file.
@@ -190,43 +509,34 @@ class ExportHandler:
             start_idx (int): Starting sequence index (inclusive).
             end_idx (int): Ending sequence index (exclusive).
             output_path (str): Path to the output file.
-            format_type (str): Format to export ("jsonl" or "csv").
+            format_type (str): Format to export ("jsonl", "csv" or "parquet", which requires pyarrow).
             return_detokenized (bool): If True, exports detokenized text; otherwise exports token arrays.
             tokenizer: The tokenizer to use for detokenization (required if return_detokenized is True).
             include_doc_details (bool): If True, includes document details in the export.
+            buffer_size (int): Size in bytes of the output file write buffer (defaults to 1 MiB).
+            compression (Optional[str]): Compress the output with "gzip" or "zstd" (requires zstandard). The matching ".gz"/".zst" suffix is appended to output_path if missing (defaults to None, i.e. uncompressed).
 
         Raises:
             ValueError: If format_type is not supported, tokenizer is None when return_detokenized is True,
                        or if start_idx >= end_idx or indices are negative.
         """
-        if format_type not in ["jsonl", "csv"]:
-            raise ValueError("format_type must be 'jsonl' or 'csv'")
-
-        if return_detokenized and tokenizer is None:
-            raise ValueError("tokenizer must be provided if return_detokenized is True")
-
-        if not isinstance(start_idx, int) or not isinstance(end_idx, int):
-            raise ValueError("start_idx and end_idx must be integers")
-
-        if start_idx < 0 or end_idx < 0:
-            raise ValueError("start_idx and end_idx must be non-negative")
-
-        if start_idx >= end_idx:
-            raise ValueError("start_idx must be less than end_idx")
-
         # Generate sequence indices for the range
         sequence_indices = list(range(start_idx, end_idx))
 
-        # Use the existing export_sequences method
-        self.export_sequences(
+        # Use the existing export_sequences implementation; the arguments were already validated
+        ExportHandler.export_sequences.__wrapped__(
+            self,
             sequence_indices=sequence_indices,
             output_path=output_path,
             format_type=format_type,
             return_detokenized=return_detokenized,
             tokenizer=tokenizer,
-            include_doc_details=include_doc_details
+            include_doc_details=include_doc_details,
+            buffer_size=buffer_size,
+            compression=compression
         )
 
+    @_validate_export_args(range_args=("start_batch", "end_batch"))
     def export_batch_range(
         self,
         start_batch: int,
@@ -237,7 +547,9 @@ class ExportHandler:
         return_detokenized: bool = True,
         tokenizer: Optional[Any] = None,
         include_doc_details: bool = False,
-        flatten_batches: bool = False
+        flatten_batches: bool = False,
+        buffer_size: int = _WRITE_BUFFER_SIZE,
+        compression: Optional[str] = None
     ) -> None:
         """
         Export a range of batches to a file.
@@ -247,36 +559,24 @@ class ExportHandler:
             end_batch (int): Ending batch ID (exclusive).
             batch_size (int): The size of each batch.
             output_path (str): Path to the output file.
-            format_type (str): Format to export ("jsonl" or "csv").
+            format_type (str): Format to export ("jsonl", "csv" or "parquet", which requires pyarrow).
             return_detokenized (bool): If True, exports detokenized text; otherwise exports token arrays.
             tokenizer: The tokenizer to use for detokenization (required if return_detokenized is True).
             include_doc_details (bool): If True, includes document details in the export.
             flatten_batches (bool): If True, flattens all batches into a single list of samples.
+            buffer_size (int): Size in bytes of the output file write buffer (defaults to 1 MiB).
+            compression (Optional[str]): Compress the output with "gzip" or "zstd" (requires zstandard). The matching ".gz"/".zst" suffix is appended to output_path if missing (defaults to None, i.e. uncompressed).
 
         Raises:
             ValueError: If format_type is not supported, tokenizer is None when return_detokenized is True,
                        or if start_batch >= end_batch or batch IDs are negative.
         """
-        if format_type not in ["jsonl", "csv"]:
-            raise ValueError("format_type must be 'jsonl' or 'csv'")
-
-        if return_detokenized and tokenizer is None:
-            raise ValueError("tokenizer must be provided if return_detokenized is True")
-
-        if not isinstance(start_batch, int) or not isinstance(end_batch, int):
-            raise ValueError("start_batch and end_batch must be integers")
-
-        if start_batch < 0 or end_batch < 0:
-            raise ValueError("start_batch and end_batch must be non-negative")
-
-        if start_batch >= end_batch:
-            raise ValueError("start_batch must be less than end_batch")
-
         # Generate batch IDs for the range
         batch_ids = list(range(start_batch, end_batch))
 
-        # Use the existing export_batches method
-        self.export_batches(
+        # Use the existing export_batches implementation; the arguments were already validated
+        ExportHandler.export_batches.__wrapped__(
+            self,
             batch_ids=batch_ids,
             batch_size=batch_size,
             output_path=output_path,
@@ -284,9 +584,12 @@ class ExportHandler:
             return_detokenized=return_detokenized,
             tokenizer=tokenizer,
             include_doc_details=include_doc_details,
-            flatten_batches=flatten_batches
+            flatten_batches=flatten_batches,
+            buffer_size=buffer_size,
+            compression=compression
         )
 
+    @_validate_export_args(range_args=("start_idx", "end_idx"))
     def export_dataset_range(
         self,
         start_idx: int,
@@ -296,7 +599,12 @@ class ExportHandler:
         return_detokenized: bool = True,
         tokenizer: Optional[Any] = None,
         include_doc_details: bool = False,
-        chunk_size: int = 1000
+        chunk_size: int = 1000,
+        buffer_size: int = _WRITE_BUFFER_SIZE,
+        num_workers: int = 1,
+        preallocate: bool = False,
+        csv_engine: str = "python",
+        compression: Optional[str] = None
     ) -> None:
         """
         Export a range of the dataset to a file with memory-efficient chunking.
@@ -305,74 +613,159 @@ class ExportHandler:
             start_idx (int): Starting sequence index (inclusive).
             end_idx (int): Ending sequence index (exclusive).
             output_path (str): Path to the output file.
-            format_type (str): Format to export ("jsonl" or "csv").
+            format_type (str): Format to export ("jsonl", "csv" or "parquet", which requires pyarrow).
             return_detokenized (bool): If True, exports detokenized text; otherwise exports token arrays.
             tokenizer: The tokenizer to use for detokenization (required if return_detokenized is True).
             include_doc_details (bool): If True, includes document details in the export.
             chunk_size (int): Number of samples to process at a time to manage memory usage.
+            buffer_size (int): Size in bytes of the output file write buffer (defaults to 1 MiB).
+            num_workers (int): Number of worker processes. Each exports a contiguous shard of the samples, and the shards are then concatenated into output_path (defaults to 1, i.e. no worker processes).
+            preallocate (bool): If True, reserves the estimated size of the output file on disk (via posix_fallocate, where available) to reduce fragmentation of large exports.
+            csv_engine (str): How CSV rows are formatted. "python" matches csv.writer output, "pyarrow" uses pyarrow's C++ CSV writer, which is faster but quotes every string field and uses \n line endings (requires pyarrow).
+            compression (Optional[str]): Compress the output with "gzip" or "zstd" (requires zstandard). The matching ".gz"/".zst" suffix is appended to output_path if missing (defaults to None, i.e. uncompressed).
 
         Raises:
             ValueError: If format_type is not supported, tokenizer is None when return_detokenized is True,
                        or if start_idx >= end_idx or indices are negative.
         """
-        if format_type not in ["jsonl", "csv"]:
-            raise ValueError("format_type must be 'jsonl' or 'csv'")
-
-        if return_detokenized and tokenizer is None:
-            raise ValueError("tokenizer must be provided if return_detokenized is True")
-
-        if not isinstance(start_idx, int) or not isinstance(end_idx, int):
-            raise ValueError("start_idx and end_idx must be integers")
-
-        if start_idx < 0 or end_idx < 0:
-            raise ValueError("start_idx and end_idx must be non-negative")
-
-        if start_idx >= end_idx:
-            raise ValueError("start_idx must be less than end_idx")
-
         # Get total number of samples to validate range
         # total_samples = len(self.manager.WriteableMMapIndexedDataset.batch_info.shuffle_idx)
         # if end_idx > total_samples:
         #     raise ValueError(f"end_idx ({end_idx}) exceeds dataset size ({total_samples})")
 
+        output_path = _with_compression_suffix(output_path, compression)
+
         # Create output directory if it doesn't exist
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        _ensure_parent(output_path)
+
+        self._export_range(
+            start_idx=start_idx,
+            end_idx=end_idx,
+            output_path=output_path,
+            format_type=format_type,
+            return_detokenized=return_detokenized,
+            tokenizer=tokenizer,
+            include_doc_details=include_doc_details,
+            chunk_size=chunk_size,
+            buffer_size=buffer_size,
+            num_workers=num_workers,
+            preallocate=preallocate,
+            csv_engine=csv_engine,
+            compression=compression
+        )
+
+    def _export_range(
+        self,
+        start_idx: int,
+        end_idx: int,
+        output_path: str,
+        format_type: str,
+        return_detokenized: bool,
+        tokenizer: Optional[Any],
+        include_doc_details: bool,
+        chunk_size: int,
+        buffer_size: int,
+        num_workers: int,
+        preallocate: bool = False,
+        csv_engine: str = "python",
+        compression: Optional[str] = None
+    ) -> None:
+        """
+        Export samples [start_idx, end_idx), fanning out to worker processes if num_workers > 1.
+        The arguments are validated by the public export methods before any file or directory is created.
+        """
+        if num_workers == 1 or end_idx - start_idx <= chunk_size:
+            self._stream_range_to_file(start_idx, end_idx, output_path, format_type, return_detokenized,
+                                       tokenizer, include_doc_details, chunk_size, buffer_size,
+                                       preallocate=preallocate, csv_engine=csv_engine, compression=compression)
+            return
+
+        # Workers inherit the manager (and its open dataset) by forking rather than pickling it
+        if "fork" not in multiprocessing.get_all_start_methods():
+            raise ValueError("num_workers > 1 requires the 'fork' multiprocessing start method")
+
+        # Compressed shards are self-contained gzip members / zstd frames, so they can be concatenated as-is
+        shard_size = -(-(end_idx - start_idx) // num_workers)
+        shards = [
+            (shard_start, min(shard_start + shard_size, end_idx), f"{output_path}.part{i}")
+            for i, shard_start in enumerate(range(start_idx, end_idx, shard_size))
+        ]
+
+        try:
+            with ProcessPoolExecutor(
+                max_workers=len(shards),
+                mp_context=multiprocessing.get_context("fork"),
+                initializer=_init_export_worker,
+                initargs=(self.manager, tokenizer)
+            ) as executor:
+                futures = [
+                    executor.submit(_export_shard, shard_start, shard_end, shard_path, format_type, return_detokenized,
+                                    include_doc_details, chunk_size, buffer_size, i == 0, preallocate, csv_engine,
+                                    compression)
+                    for i, (shard_start, shard_end, shard_path) in enumerate(shards)
+                ]
+                for future in futures:
+                    future.result()
+
+            with open(output_path, 'wb') as out:
+                if preallocate and hasattr(os, 'posix_fallocate'):
+                    try:
+                        os.posix_fallocate(out.fileno(), 0, sum(os.path.getsize(path) for _, _, path in shards))
+                    except OSError:
+                        pass
+                for _, _, shard_path in shards:
+                    with open(shard_path, 'rb') as shard:
+                        shutil.copyfileobj(shard, out, _SHARD_COPY_BUFFER_SIZE)
+        finally:
+            for _, _, shard_path in shards:
+                if os.path.exists(shard_path):
+                    os.remove(shard_path)
+
+    def _stream_range_to_file(
+        self,
+        start_idx: int,
+        end_idx: int,
+        output_path: str,
+        format_type: str,
+        return_detokenized: bool,
+        tokenizer: Optional[Any],
+        include_doc_details: bool,
+        chunk_size: int,
+        buffer_size: int,
+        write_header: bool = True,
+        preallocate: bool = False,
+        csv_engine: str = "python",
+        compression: Optional[str] = None
+    ) -> None:
+        """Stream samples [start_idx, end_idx) to a single file, fetching chunk_size samples at a time."""
+        # The compressed size can't be extrapolated from the uncompressed bytes written so far,
+        # and the parquet writer manages its own file
+        preallocate = preallocate and compression is None and format_type != "parquet"
+        expected_records = end_idx - start_idx if preallocate else None
+        samples = self.manager.sample.iter_samples_by_indices(
+            indices=range(start_idx, end_idx),
+            return_doc_details=include_doc_details,
+            return_detokenized=return_detokenized,
+            tokenizer=tokenizer,
+            chunk_size=chunk_size
+        )
 
-        # Export in chunks to manage memory
         if format_type == "jsonl":
-            with open(output_path, 'w', encoding='utf-8') as f:
-                current_idx = start_idx
-                while current_idx < end_idx:
-                    chunk_end = min(current_idx + chunk_size, end_idx)
-                    chunk_indices = list(range(current_idx, chunk_end))
-                    
-                    chunk_samples = self.manager.sample.get_samples_by_indices(
-                        indices=chunk_indices,
-                        return_doc_details=include_doc_details,
-                        return_detokenized=return_detokenized,
-                        tokenizer=tokenizer
-                    )
-                    
-                    self._write_chunk_to_jsonl(chunk_samples, f, include_doc_details, current_idx)
-                    current_idx = chunk_end
+            with _open_export_file(output_path, False, buffer_size, compression) as f:
+                self._write_chunk_to_jsonl(samples, f, include_doc_details, start_idx, expected_records,
+                                           detokenized=return_detokenized)
+                if preallocate:
+                    f.truncate()
 
         elif format_type == "csv":
-            with open(output_path, 'w', newline='', encoding='utf-8') as f:
-                writer = None
-                current_idx = start_idx
-                while current_idx < end_idx:
-                    chunk_end = min(current_idx + chunk_size, end_idx)
-                    chunk_indices = list(range(current_idx, chunk_end))
-                    
-                    chunk_samples = self.manager.sample.get_samples_by_indices(
-                        indices=chunk_indices,
-                        return_doc_details=include_doc_details,
-                        return_detokenized=return_detokenized,
-                        tokenizer=tokenizer
-                    )
-                    
-                    writer = self._write_chunk_to_csv(chunk_samples, f, writer, include_doc_details, current_idx)
-                    current_idx = chunk_end
+            with _open_export_file(output_path, True, buffer_size, compression) as f:
+                self._write_chunk_to_csv(samples, f, include_doc_details, start_idx, write_header, expected_records,
+                                         csv_engine, detokenized=return_detokenized)
+                if preallocate:
+                    f.truncate()
+
+        elif format_type == "parquet":
+            self._write_chunk_to_parquet(samples, output_path, include_doc_details, start_idx, detokenized=return_detokenized)
 
     def _export_to_jsonl(
         self,
@@ -380,18 +773,18 @@ class ExportHandler:
         output_path: str,
         flatten: bool,
         include_doc_details: bool,
-        export_type: str
+        export_type: str,
+        buffer_size: int = _WRITE_BUFFER_SIZE,
+        compression: Optional[str] = None,
+        detokenized: bool = False
     ) -> None:
-        """Export data to JSONL format."""
-        with open(output_path, 'w', encoding='utf-8') as f:
+        """Export data to JSONL format. `detokenized` indicates that every (flattened) sample is a string."""
+        with _open_export_file(output_path, False, buffer_size, compression) as f:
             if flatten:
-                # Flatten all batches/sequences into a single list
-                flattened_data = []
-                for batch in data:
-                    flattened_data.extend(batch)
-                data = flattened_data
+                # Flatten all batches/sequences into a single stream of samples
+                data = chain.from_iterable(data)
 
-            self._write_chunk_to_jsonl(data, f, include_doc_details, 0)
+            self._write_chunk_to_jsonl(data, f, include_doc_details, 0, detokenized=detokenized)
 
     def _export_to_csv(
         self,
@@ -399,81 +792,179 @@ class ExportHandler:
         output_path: str,
         flatten: bool,
         include_doc_details: bool,
-        export_type: str
+        export_type: str,
+        buffer_size: int = _WRITE_BUFFER_SIZE,
+        compression: Optional[str] = None,
+        detokenized: bool = False
     ) -> None:
-        """Export data to CSV format."""
-        with open(output_path, 'w', newline='', encoding='utf-8') as f:
+        """Export data to CSV format. `detokenized` indicates that every (flattened) sample is a string."""
+        with _open_export_file(output_path, True, buffer_size, compression) as f:
             if flatten:
-                # Flatten all batches/sequences into a single list
-                flattened_data = []
-                for batch in data:
-                    flattened_data.extend(batch)
-                data = flattened_data
+                # Flatten all batches/sequences into a single stream of samples
+                data = chain.from_iterable(data)
 
-            self._write_chunk_to_csv(data, f, None, include_doc_details, 0)
+            self._write_chunk_to_csv(data, f, include_doc_details, 0, detokenized=detokenized)
 
     def _write_chunk_to_jsonl(
         self,
-        chunk_data: List[Any],
+        chunk_data: Iterable[Any],
         file_handle,
         include_doc_details: bool,
-        start_idx: int
+        start_idx: int,
+        expected_records: Optional[int] = None,
+        detokenized: bool = False
     ) -> None:
-        """Write a chunk of data to JSONL format."""
+        """
+        Write a chunk (or stream) of data to JSONL format. `file_handle` must be opened in binary mode.
+        If expected_records is given, the file is preallocated after the first batch of lines is written.
+        If detokenized is True, every sample is known to be a string and is written as-is.
+        """
+        # Pick the content conversion once instead of type-checking every sample
+        content_of = _text_content if detokenized else _sample_content
+
+        # Serialized lines are handed to the file in batches rather than one write per record
+        lines = []
         for i, sample in enumerate(chunk_data):
             if include_doc_details:
                 content, doc_details = sample
                 record = {
                     "index": start_idx + i,
-                    "content": content if isinstance(content, str) else content.tolist(),
+                    "content": content_of(content),
                     "doc_details": doc_details
                 }
             else:
                 record = {
                     "index": start_idx + i,
-                    "content": sample if isinstance(sample, str) else sample.tolist()
+                    "content": content_of(sample)
                 }
             
-            json.dump(record, file_handle, ensure_ascii=False)
-            file_handle.write('\n')
+            lines.append(_dumps_jsonl(record))
+            if len(lines) >= _LINES_PER_WRITE:
+                _write_lines(file_handle, lines)
+                lines = []
+                if expected_records and i < _LINES_PER_WRITE:
+                    _preallocate(file_handle, i + 1, expected_records)
+
+        if lines:
+            _write_lines(file_handle, lines)
+
+    def _write_chunk_to_parquet(
+        self,
+        chunk_data: Iterable[Any],
+        output_path: str,
+        include_doc_details: bool,
+        start_idx: int,
+        detokenized: bool = False
+    ) -> None:
+        """
+        Write a chunk (or stream) of data to a zstd-compressed Parquet file, one row group per
+        _PARQUET_ROWS_PER_GROUP samples. Document details become one (dictionary-encoded) column each.
+        """
+        # Determine the detail columns based on the first sample, putting it back in front of the stream
+        chunk_data = iter(chunk_data)
+        first_sample = next(chunk_data, None)
+        if first_sample is not None:
+            chunk_data = chain([first_sample], chunk_data)
+
+        detail_names = []
+        if include_doc_details and first_sample is not None:
+            _, sample_doc_details = first_sample
+            if sample_doc_details:
+                detail_names = list(sample_doc_details.keys())
+
+        writer = None
+        indices, contents, doc_details = [], [], []
+        try:
+            for i, sample in enumerate(chunk_data, start_idx):
+                if include_doc_details:
+                    content, details = sample
+                    doc_details.append(details)
+                else:
+                    content = sample
+                indices.append(i)
+                contents.append(content)
+
+                if len(indices) >= _PARQUET_ROWS_PER_GROUP:
+                    table = _parquet_table(indices, contents, doc_details, detail_names, detokenized)
+                    if writer is None:
+                        writer = pq.ParquetWriter(output_path, table.schema, compression="zstd", use_dictionary=True)
+                    writer.write_table(table)
+                    indices, contents, doc_details = [], [], []
+
+            if indices:
+                table = _parquet_table(indices, contents, doc_details, detail_names, detokenized)
+            elif writer is None:
+                # Nothing to export, still write a valid (empty) file
+                table = pa.table({
+                    "index": pa.array([], type=pa.int64()),
+                    "content": pa.array([], type=pa.string() if detokenized else pa.list_(pa.int64()))
+                })
+            else:
+                table = None
+
+            if table is not None:
+                if writer is None:
+                    writer = pq.ParquetWriter(output_path, table.schema, compression="zstd", use_dictionary=True)
+                writer.write_table(table)
+        finally:
+            if writer is not None:
+                writer.close()
 
     def _write_chunk_to_csv(
         self,
-        chunk_data: List[Any],
+        chunk_data: Iterable[Any],
         file_handle,
-        writer,
         include_doc_details: bool,
-        start_idx: int
-    ):
-        """Write a chunk of data to CSV format."""
-        if writer is None:
-            # Determine fieldnames based on the first sample
-            if include_doc_details and chunk_data:
-                sample_content, sample_doc_details = chunk_data[0]
-                fieldnames = ["index", "content"]
-                if sample_doc_details:
-                    fieldnames.extend(sample_doc_details.keys())
-            else:
-                fieldnames = ["index", "content"]
-            
-            writer = csv.DictWriter(file_handle, fieldnames=fieldnames)
-            writer.writeheader()
+        start_idx: int,
+        write_header: bool = True,
+        expected_records: Optional[int] = None,
+        csv_engine: str = "python",
+        detokenized: bool = False
+    ) -> None:
+        """
+        Write a chunk (or stream) of data to CSV format.
+        If expected_records is given, the file is preallocated after the first batch of rows is written.
+        If detokenized is True, every sample is known to be a string and is written as-is.
+        """
+        content_of = _text_content if detokenized else _csv_content
 
-        for i, sample in enumerate(chunk_data):
+        # Determine fieldnames based on the first sample, putting it back in front of the stream
+        chunk_data = iter(chunk_data)
+        first_sample = next(chunk_data, None)
+        if first_sample is not None:
+            chunk_data = chain([first_sample], chunk_data)
+
+        detail_names = []
+        if include_doc_details and first_sample is not None:
+            _, sample_doc_details = first_sample
+            if sample_doc_details:
+                detail_names = list(sample_doc_details.keys())
+
+        column_names = ["index", "content", *detail_names]
+        # The header goes out with the first batch of rows, through the same engine
+        header_pending = write_header
+
+        # Rows are formatted directly rather than through csv.DictWriter, which builds and
+        # quote-checks a list from a dict for every row
+        rows = []
+
+        for i, sample in enumerate(chunk_data, start_idx):
             if include_doc_details:
                 content, doc_details = sample
-                row = {
-                    "index": start_idx + i,
-                    "content": content if isinstance(content, str) else str(content.tolist())
-                }
-                if doc_details:
-                    row.update(doc_details)
+                fields = [i, content_of(content)]
+                if detail_names:
+                    doc_details = doc_details or {}
+                    fields.extend(doc_details.get(name, '') for name in detail_names)
             else:
-                row = {
-                    "index": start_idx + i,
-                    "content": sample if isinstance(sample, str) else str(sample.tolist())
-                }
-            
-            writer.writerow(row)
-        
-        return writer
\ No newline at end of file
+                fields = [i, content_of(sample)]
+
+            rows.append(fields)
+            if len(rows) >= _LINES_PER_WRITE:
+                _write_csv_rows(file_handle, rows, column_names, csv_engine, header_pending)
+                header_pending = False
+                rows = []
+                if expected_records and i - start_idx < _LINES_PER_WRITE:
+                    _preallocate(file_handle, i - start_idx + 1, expected_records)
+
+        if rows or header_pending:
+            _write_csv_rows(file_handle, rows, column_names, csv_engine, header_pending)
@@ -1,16 +1,208 @@
-from typing import TYPE_CHECKING, Optional, Dict
+from typing import TYPE_CHECKING, Optional, Dict, List, Tuple, Callable, Any, BinaryIO, Union
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 import os
+import shutil
+import threading
 import subprocess
 import logging
 import pandas as pd
 import json
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+try:
+    import zstandard as zstd
+except ImportError:
+    zstd = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pacsv
+except ImportError:
+    pa = None
+    pc = None
+    pacsv = None
+
 if TYPE_CHECKING:
     from ..manager import DatasetManager
 
 logger = logging.getLogger(__name__)
 
+# Default size of the write buffer for the temporary JSONL file
+_WRITE_BUFFER_SIZE = 1 << 20
+
+# Size of the blocks parsed at a time by the pyarrow CSV reader
+_CSV_BLOCK_SIZE = 8 << 20
+
+# Size of the blocks read from the tokenization subprocess output
+_SUBPROCESS_READ_SIZE = 1 << 16
+
+# Number of trailing tokenizer output lines kept in memory to report on failure
+_LOG_TAIL_LINES = 1024
+
+def _dumps_text_line(text: str) -> bytes:
+    """Serializes a text record to a newline-terminated UTF-8 JSON line, using the fastest available encoder.
+    Every encoder writes compact separators and unescaped non-ASCII text, so the output bytes do not depend on which is installed."""
+    if orjson is not None:
+        return orjson.dumps({"text": text}, option=orjson.OPT_APPEND_NEWLINE)
+    if ujson is not None:
+        return (ujson.dumps({"text": text}, ensure_ascii=False, escape_forward_slashes=False) + '\n').encode('utf-8')
+    return (json.dumps({"text": text}, ensure_ascii=False, separators=(",", ":")) + '\n').encode('utf-8')
+
+def _require_paths(paths: List[Tuple[str, str]]) -> None:
+    """Stats each (description, path) pair in order, raising FileNotFoundError for the first one that does not exist."""
+    for description, path in paths:
+        try:
+            os.stat(path)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"{description} not found: {path}") from None
+
+def _missing_files(files: Dict[str, str]) -> List[str]:
+    """Returns "name: path" for each entry of files that does not exist. Checks each expected path directly,
+    which stays cheap in output directories holding many other files."""
+    return [f"{file_type}: {file_path}" for file_type, file_path in files.items() if not os.path.exists(file_path)]
+
+def _drain_output(stream: BinaryIO, log_f: BinaryIO, log_tail: deque) -> None:
+    """
+    Copies a subprocess output stream to log_f in blocks until EOF, forwarding complete lines to the logger
+    and keeping the most recent ones in log_tail. read1 returns whatever is available, so progress still
+    shows up while the subprocess runs.
+    """
+    partial_line = b""
+    while True:
+        block = stream.read1(_SUBPROCESS_READ_SIZE)
+        if not block:
+            break
+        log_f.write(block)
+        lines = (partial_line + block).split(b"\n")
+        partial_line = lines.pop()
+        if lines:
+            log_tail.extend(lines)
+            logger.info(b"\n".join(lines).decode('utf-8', errors='replace').strip())
+    if partial_line:
+        log_tail.append(partial_line)
+        logger.info(partial_line.decode('utf-8', errors='replace').strip())
+
+def _chunk_to_jsonl_bytes(texts: Union[pd.Series, "pa.Array"]) -> Tuple[bytes, int]:
+    """Strips a chunk of the text column and serializes its non-empty rows. Returns the JSONL bytes and the row count."""
+    if pa is not None and isinstance(texts, pa.Array):
+        # Already a string column read by the pyarrow CSV reader
+        trimmed = pc.utf8_trim_whitespace(texts)
+        texts = trimmed.filter(pc.greater(pc.utf8_length(trimmed), 0)).to_pylist()
+    elif pc is not None:
+        # Trim, measure and filter in Arrow's C++ kernels rather than through pandas' object-dtype string methods
+        trimmed = pc.utf8_trim_whitespace(pa.array(texts.astype(str).to_numpy(), type=pa.string()))
+        texts = trimmed.filter(pc.greater(pc.utf8_length(trimmed), 0)).to_pylist()
+    else:
+        texts = texts.astype(str).str.strip()
+        texts = texts[texts.str.len() > 0].to_numpy()
+    return b"".join([_dumps_text_line(text_content) for text_content in texts]), len(texts)
+
+def _write_csv_as_jsonl(input_csv_path: str, text_column: str, jsonl_file: BinaryIO, chunk_size: int, conversion_workers: int,
+                        csv_engine: str = "pandas") -> int:
+    """Writes the non-empty rows of a CSV text column to jsonl_file as JSONL. Returns the number of rows written."""
+    total_rows = 0
+
+    def missing_column_error() -> ValueError:
+        return ValueError(f"Column '{text_column}' not found in CSV. Available columns: {list(pd.read_csv(input_csv_path, nrows=0).columns)}")
+
+    if csv_engine == "pyarrow":
+        # The column is read as raw strings, so the schema is validated once when the reader is opened
+        try:
+            reader = pacsv.open_csv(
+                input_csv_path,
+                read_options=pacsv.ReadOptions(block_size=_CSV_BLOCK_SIZE, use_threads=True),
+                convert_options=pacsv.ConvertOptions(include_columns=[text_column], column_types={text_column: pa.string()})
+            )
+        except KeyError:
+            raise missing_column_error() from None
+
+        def text_chunks():
+            for batch in reader:
+                yield batch.column(0)
+    else:
+        # Only materialize the text column; a callable keeps a missing column from failing inside pandas
+        reader = pd.read_csv(input_csv_path, chunksize=chunk_size, usecols=lambda column: column == text_column)
+
+        def text_chunks():
+            for chunk_df in reader:
+                # Validate that text column exists
+                if text_column not in chunk_df.columns:
+                    raise missing_column_error()
+                yield chunk_df[text_column]
+
+    if conversion_workers == 1:
+        for texts in text_chunks():
+            # One write per chunk instead of one per row
+            chunk_bytes, chunk_rows = _chunk_to_jsonl_bytes(texts)
+            jsonl_file.write(chunk_bytes)
+            total_rows += chunk_rows
+    else:
+        # Keep a bounded number of chunks in flight so the CSV is never fully held in memory,
+        # and write results in submission order so the JSONL keeps the CSV row order
+        with ProcessPoolExecutor(max_workers=conversion_workers) as executor:
+            pending = deque()
+            for texts in text_chunks():
+                pending.append(executor.submit(_chunk_to_jsonl_bytes, texts))
+                if len(pending) >= 2 * conversion_workers:
+                    chunk_bytes, chunk_rows = pending.popleft().result()
+                    jsonl_file.write(chunk_bytes)
+                    total_rows += chunk_rows
+            while pending:
+                chunk_bytes, chunk_rows = pending.popleft().result()
+                jsonl_file.write(chunk_bytes)
+                total_rows += chunk_rows
+    return total_rows
+
+@contextmanager
+def _fifo_feed(fifo_path: str, write_fn: Callable[[BinaryIO], Any]):
+    """
+    Creates a named pipe at fifo_path and feeds it from write_fn in a background thread while the body runs.
+    Yields a dict that holds write_fn's return value under "result" once the pipe has been fully written.
+    An error raised by write_fn is re-raised on exit, since it is the root cause of any tokenizer failure.
+    """
+    os.mkfifo(fifo_path)
+    feed = {}
+
+    def run():
+        try:
+            with open(fifo_path, 'wb', buffering=_WRITE_BUFFER_SIZE) as fifo:
+                feed["result"] = write_fn(fifo)
+        except BrokenPipeError:
+            # The reader went away early; its own failure is reported by the caller
+            pass
+        except BaseException as e:
+            feed["error"] = e
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    try:
+        yield feed
+    finally:
+        # If the reader never opened the pipe, the writer is still blocked opening it.
+        # Briefly opening the read end releases it, after which its writes fail with a broken pipe.
+        while thread.is_alive():
+            try:
+                os.close(os.open(fifo_path, os.O_RDONLY | os.O_NONBLOCK))
+            except OSError:
+                pass
+            thread.join(timeout=0.1)
+        os.remove(fifo_path)
+        if "error" in feed:
+            raise feed["error"]
+
 class IngestHandler:
     def __init__(self, manager: 'DatasetManager'):
         self.manager = manager
@@ -31,7 +223,8 @@ class IngestHandler:
         Ingest and tokenize a JSONL file using GPT-NeoX preprocessing pipeline.
         
         Parameters:
-            input_jsonl_path (str): Path to the input JSONL file.
+            input_jsonl_path (str): Path to the input JSONL file. Zstandard-compressed files (".zst") are decompressed on the fly
+                and streamed to the tokenizer through a named pipe (requires zstandard).
             output_prefix (str): Prefix for the output tokenized files.
             vocab_path (str): Path to the vocab file.
             neox_dir (str): Path to the GPT-NeoX directory.
@@ -46,21 +239,17 @@ class IngestHandler:
             
         Raises:
             FileNotFoundError: If input files or directories don't exist.
+            ValueError: If the input is zstd-compressed but zstandard is not installed.
             subprocess.CalledProcessError: If tokenization process fails.
         """
         # Validate inputs
-        if not os.path.exists(input_jsonl_path):
-            raise FileNotFoundError(f"Input JSONL file not found: {input_jsonl_path}")
-        
-        if not os.path.exists(vocab_path):
-            raise FileNotFoundError(f"Tokenizer file not found: {vocab_path}")
-            
-        if not os.path.exists(neox_dir):
-            raise FileNotFoundError(f"GPT-NeoX directory not found: {neox_dir}")
-            
         preprocess_script = os.path.join(neox_dir, "tools/datasets/preprocess_data.py")
-        if not os.path.exists(preprocess_script):
-            raise FileNotFoundError(f"Preprocessing script not found: {preprocess_script}")
+        _require_paths([
+            ("Input JSONL file", input_jsonl_path),
+            ("Tokenizer file", vocab_path),
+            ("GPT-NeoX directory", neox_dir),
+            ("Preprocessing script", preprocess_script),
+        ])
 
         # Create output directory if it doesn't exist
         output_dir = os.path.dirname(output_prefix)
@@ -71,6 +260,19 @@ class IngestHandler:
         if log_file is None:
             log_file = f"{output_prefix}_tokenize.log"
 
+        if input_jsonl_path.endswith(".zst"):
+            return self._ingest_from_zstd_jsonl(
+                input_jsonl_path=input_jsonl_path,
+                output_prefix=output_prefix,
+                vocab_path=vocab_path,
+                neox_dir=neox_dir,
+                workers=workers,
+                append_eod=append_eod,
+                dataset_impl=dataset_impl,
+                tokenizer_type=tokenizer_type,
+                log_file=log_file
+            )
+
         logger.info(f"Starting tokenization of {input_jsonl_path}")
         logger.info(f"Output prefix: {output_prefix}")
         logger.info(f"Using vocab file: {vocab_path}")
@@ -90,24 +292,21 @@ class IngestHandler:
             cmd.append("--append-eod")
 
         try:
-            # Run the tokenization process with tee-like logging
-            with open(log_file, 'w') as log_f:
+            # Run the tokenization process with tee-like logging, keeping the end of the output for error reports
+            log_tail = deque(maxlen=_LOG_TAIL_LINES)
+            with open(log_file, 'wb') as log_f:
                 process = subprocess.Popen(
                     cmd,
                     stdout=subprocess.PIPE,
                     stderr=subprocess.STDOUT,
-                    text=True,
-                    bufsize=1,
-                    universal_newlines=True
+                    bufsize=-1
                 )
                 
-                # Stream output to both log file and logger
-                for line in process.stdout:
-                    log_f.write(line)
-                    log_f.flush()
-                    logger.info(line.strip())
-                
+                # Drain the output on a background thread so the pipe never fills up and stalls the tokenizer
+                drain_thread = threading.Thread(target=_drain_output, args=(process.stdout, log_f, log_tail), daemon=True)
+                drain_thread.start()
                 process.wait()
+                drain_thread.join()
                 
                 if process.returncode != 0:
                     raise subprocess.CalledProcessError(process.returncode, cmd)
@@ -121,11 +320,7 @@ class IngestHandler:
                 "log_file": log_file
             }
             
-            missing_files = []
-            for file_type, file_path in expected_files.items():
-                if not os.path.exists(file_path):
-                    missing_files.append(f"{file_type}: {file_path}")
-            
+            missing_files = _missing_files(expected_files)
             if missing_files:
                 raise FileNotFoundError(f"Expected output files not found: {missing_files}")
             
@@ -133,12 +328,40 @@ class IngestHandler:
             
         except subprocess.CalledProcessError as e:
             logger.error(f"Tokenization failed with return code {e.returncode}")
-            if os.path.exists(log_file):
-                with open(log_file, 'r') as f:
-                    log_content = f.read()
-                logger.error(f"Tokenization log:\n{log_content}")
+            # Report the tail kept while streaming instead of reading the whole log back from disk
+            log_content = b"\n".join(log_tail).decode('utf-8', errors='replace')
+            logger.error(f"Tokenization log (last {len(log_tail)} lines, full log at {log_file}):\n{log_content}")
             raise
 
+    def _ingest_from_zstd_jsonl(self, input_jsonl_path: str, output_prefix: str, **kwargs) -> Dict[str, str]:
+        """
+        Tokenizes a zstd-compressed JSONL file by decompressing it into a named pipe read by the tokenizer,
+        so the decompressed corpus never touches the disk. Falls back to a temporary decompressed file where
+        named pipes are unavailable.
+        """
+        if zstd is None:
+            raise ValueError("zstandard must be installed to ingest zstd-compressed JSONL files.")
+
+        def decompress(jsonl_file: BinaryIO) -> None:
+            with open(input_jsonl_path, 'rb') as compressed, zstd.ZstdDecompressor().stream_reader(compressed) as reader:
+                shutil.copyfileobj(reader, jsonl_file, _WRITE_BUFFER_SIZE)
+
+        if hasattr(os, "mkfifo"):
+            stream_path = f"{output_prefix}_stream.jsonl"
+            logger.info(f"Streaming decompressed input to tokenizer: {input_jsonl_path} -> {stream_path}")
+            with _fifo_feed(stream_path, decompress):
+                return self.ingest_from_jsonl(input_jsonl_path=stream_path, output_prefix=output_prefix, **kwargs)
+
+        temp_jsonl_path = f"{output_prefix}_temp.jsonl"
+        logger.info(f"Decompressing input: {input_jsonl_path} -> {temp_jsonl_path}")
+        try:
+            with open(temp_jsonl_path, 'wb', buffering=_WRITE_BUFFER_SIZE) as jsonl_file:
+                decompress(jsonl_file)
+            return self.ingest_from_jsonl(input_jsonl_path=temp_jsonl_path, output_prefix=output_prefix, **kwargs)
+        finally:
+            if os.path.exists(temp_jsonl_path):
+                os.remove(temp_jsonl_path)
+
     def ingest_from_csv(
         self,
         input_csv_path: str,
@@ -152,7 +375,10 @@ class IngestHandler:
         tokenizer_type: str,
         log_file: Optional[str] = None,
         chunk_size: int = 10000,
-        cleanup_temp: bool = True
+        cleanup_temp: bool = True,
+        conversion_workers: int = 1,
+        stream_to_tokenizer: bool = False,
+        csv_engine: str = "pandas"
     ) -> Dict[str, str]:
         """
         Fast import and tokenize a CSV file by converting to JSONL first.
@@ -168,46 +394,42 @@ class IngestHandler:
             dataset_impl (str): Dataset implementation type.
             tokenizer_type (str): Type of tokenizer to use.
             log_file (Optional[str]): Path to save tokenization logs.
-            chunk_size (int): Number of rows to process at once for memory efficiency.
+            chunk_size (int): Number of rows to process at once for memory efficiency. Only used by the "pandas" engine.
             cleanup_temp (bool): Whether to clean up temporary JSONL file.
+            conversion_workers (int): Number of processes converting CSV chunks to JSONL (defaults to 1, converting in this process).
+            stream_to_tokenizer (bool): If True, feeds the converted rows to the tokenizer through a named pipe instead of
+                writing the whole corpus to a temporary JSONL file first. Falls back to the temporary file where named pipes are unavailable.
+            csv_engine (str): How the CSV is parsed. "pandas" uses pandas.read_csv, "pyarrow" uses pyarrow's multithreaded streaming
+                reader, which is faster but reads the column as raw strings (e.g. empty cells stay empty instead of becoming "nan") (requires pyarrow).
             
         Returns:
             Dict[str, str]: Dictionary containing paths to generated files.
             
         Raises:
             FileNotFoundError: If input file doesn't exist.
-            ValueError: If text_column doesn't exist in CSV.
+            ValueError: If text_column doesn't exist in CSV, conversion_workers is not a positive integer, or csv_engine is invalid or unavailable.
         """
         if not os.path.exists(input_csv_path):
             raise FileNotFoundError(f"Input CSV file not found: {input_csv_path}")
 
-        # Create temporary JSONL file
-        temp_jsonl_path = f"{output_prefix}_temp.jsonl"
-        
-        logger.info(f"Converting CSV to JSONL: {input_csv_path} -> {temp_jsonl_path}")
-        
-        try:
-            # Read CSV in chunks for memory efficiency
-            total_rows = 0
-            with open(temp_jsonl_path, 'w', encoding='utf-8') as jsonl_file:
-                for chunk_df in pd.read_csv(input_csv_path, chunksize=chunk_size):
-                    # Validate that text column exists
-                    if text_column not in chunk_df.columns:
-                        raise ValueError(f"Column '{text_column}' not found in CSV. Available columns: {list(chunk_df.columns)}")
-                    
-                    # Convert each row to JSONL format
-                    for _, row in chunk_df.iterrows():
-                        text_content = str(row[text_column]).strip()
-                        if text_content:  # Skip empty rows
-                            json_record = {"text": text_content}
-                            jsonl_file.write(json.dumps(json_record, ensure_ascii=False) + '\n')
-                            total_rows += 1
-            
-            logger.info(f"Converted {total_rows} rows from CSV to JSONL")
-            
-            # Now use the existing ingest_from_jsonl method
-            result = self.ingest_from_jsonl(
-                input_jsonl_path=temp_jsonl_path,
+        if conversion_workers < 1:
+            raise ValueError("conversion_workers must be a positive integer.")
+
+        if csv_engine not in ("pandas", "pyarrow"):
+            raise ValueError("csv_engine must be 'pandas' or 'pyarrow'.")
+        if csv_engine == "pyarrow" and pacsv is None:
+            raise ValueError("pyarrow must be installed to use csv_engine='pyarrow'.")
+
+        stream = stream_to_tokenizer and hasattr(os, "mkfifo")
+        if stream_to_tokenizer and not stream:
+            logger.warning("Named pipes are not supported on this platform, converting through a temporary JSONL file instead.")
+
+        def convert(jsonl_file: BinaryIO) -> int:
+            return _write_csv_as_jsonl(input_csv_path, text_column, jsonl_file, chunk_size, conversion_workers, csv_engine)
+
+        def tokenize(input_jsonl_path: str) -> Dict[str, str]:
+            return self.ingest_from_jsonl(
+                input_jsonl_path=input_jsonl_path,
                 output_prefix=output_prefix,
                 vocab_path=vocab_path,
                 neox_dir=neox_dir,
@@ -217,12 +439,31 @@ class IngestHandler:
                 tokenizer_type=tokenizer_type,
                 log_file=log_file
             )
+
+        # Temporary JSONL file, or the named pipe feeding the tokenizer when streaming
+        temp_jsonl_path = f"{output_prefix}_stream.jsonl" if stream else f"{output_prefix}_temp.jsonl"
+        
+        try:
+            if stream:
+                logger.info(f"Streaming CSV to tokenizer: {input_csv_path} -> {temp_jsonl_path}")
+                with _fifo_feed(temp_jsonl_path, convert) as feed:
+                    result = tokenize(temp_jsonl_path)
+                total_rows = feed.get("result")
+                logger.info(f"Streamed {total_rows} rows from CSV to the tokenizer")
+            else:
+                logger.info(f"Converting CSV to JSONL: {input_csv_path} -> {temp_jsonl_path}")
+                with open(temp_jsonl_path, 'wb', buffering=_WRITE_BUFFER_SIZE) as jsonl_file:
+                    total_rows = convert(jsonl_file)
+                logger.info(f"Converted {total_rows} rows from CSV to JSONL")
+                
+                # Now use the existing ingest_from_jsonl method
+                result = tokenize(temp_jsonl_path)
             
             # Add info about the conversion
             result["source_csv"] = input_csv_path
             result["text_column"] = text_column
             result["total_rows"] = total_rows
-            result["temp_jsonl"] = temp_jsonl_path
+            result["temp_jsonl"] = None if stream else temp_jsonl_path
             
             return result
             
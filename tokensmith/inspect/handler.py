@@ -1,6 +1,6 @@
 from typing import TYPE_CHECKING, Union, List, Dict, Tuple, Optional, Any
 import numpy as np
-from ..utils import generate_training_sample
+from ..utils import generate_training_sample, generate_training_samples
 
 try:
     from transformers import AutoTokenizer
@@ -71,6 +71,7 @@ class InspectHandler:
         return_doc_details: bool = False,
         return_detokenized: bool = False,
         tokenizer: Optional[Any] = None,
+        batch_decode: bool = True,
     ) -> Union[List[List[np.ndarray]], List[str], List[Tuple[List[np.ndarray], Dict]], List[Tuple[str, Dict]]]:
         """
         Returns a batch of samples by batch ID, optionally with document details and/or detokenized.
@@ -81,6 +82,7 @@ class InspectHandler:
             return_doc_details (bool): If True, includes associated document details.
             return_detokenized (bool): If True, returns detokenized text instead of token arrays.
             tokenizer: The tokenizer to use for detokenization (required if return_detokenized is True).
+            batch_decode (bool): If True, detokenizes the whole batch with one `tokenizer.batch_decode` call (when available) instead of one `decode` call per sample.
 
         Raises:
             ValueError: If batch_id is not a non-negative integer or if tokenizer is None when return_detokenized is True.
@@ -97,17 +99,27 @@ class InspectHandler:
         if return_detokenized and tokenizer is None:
             raise ValueError("tokenizer must be provided if return_detokenized is True.")
 
-        indices = [i for i in range(batch_id * batch_size, (batch_id + 1) * batch_size)]
+        indices = np.arange(batch_id * batch_size, (batch_id + 1) * batch_size, dtype=np.int64)
 
-        batch_data = []
+        # Look up and read the whole batch in one call, then detokenize the results
+        responses = self.manager.WriteableMMapIndexedDataset.get_examples_by_ids(
+            example_locs=indices,
+            return_doc_details=return_doc_details
+        )
+
+        if not return_detokenized:
+            return responses
+
+        if return_doc_details:
+            output_seqs = [output_seq for output_seq, _ in responses]
+        else:
+            output_seqs = responses
 
-        for sample_id in indices:
-            sample = self.inspect_sample_by_id(
-                sample_id=sample_id,
-                return_doc_details=return_doc_details,
-                return_detokenized=return_detokenized,
-                tokenizer=tokenizer
-            )
-            batch_data.append(sample)
+        if batch_decode:
+            output_seqs = generate_training_samples(output_seqs, tokenizer)
+        else:
+            output_seqs = [generate_training_sample(output_seq, tokenizer) for output_seq in output_seqs]
 
-        return batch_data
\ No newline at end of file
+        if return_doc_details:
+            return [(output_seq, doc_details) for output_seq, (_, doc_details) in zip(output_seqs, responses)]
+        return output_seqs
\ No newline at end of file
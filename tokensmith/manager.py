@@ -1,25 +1,88 @@
-from typing import Dict, Any, Optional
-from tokensmith.edit import EditHandler
-from tokensmith.inspect import InspectHandler
-from tokensmith.search import SearchHandler
-from tokensmith.sample import SampleHandler
-from tokensmith.export import ExportHandler
-from tokensmith.ingest import IngestHandler
-from tokensmith.utils import WriteableMMapIndexedDataset
-from typing import Optional
+from typing import TYPE_CHECKING, Dict, Any, Optional
+
+if TYPE_CHECKING:
+    from tokensmith.edit import EditHandler
+    from tokensmith.inspect import InspectHandler
+    from tokensmith.search import SearchHandler
+    from tokensmith.sample import SampleHandler
+    from tokensmith.export import ExportHandler
+    from tokensmith.ingest import IngestHandler
+    from tokensmith.utils import WriteableMMapIndexedDataset
+
+# Marks a handler that has been set up but not constructed yet; it is built on first access
+_PENDING = object()
 
 class DatasetManager:
+    __slots__ = ("_edit", "_inspect", "_sample", "_export", "search", "_ingest", "WriteableMMapIndexedDataset")
+
     def __init__(self):
-        # Edit, Inspect, Sample, and Export handlers are initialized to None and will be set up when setup_edit_inspect_sample_export is called
-        self.edit: Optional[EditHandler] = None
-        self.inspect: Optional[InspectHandler] = None
-        self.sample: Optional[SampleHandler] = None
-        self.export: Optional[ExportHandler] = None
+        # Edit, Inspect, Sample, and Export handlers are None until setup_edit_inspect_sample_export is called,
+        # after which each one is imported and constructed the first time it is accessed
+        self._edit: Optional['EditHandler'] = None
+        self._inspect: Optional['InspectHandler'] = None
+        self._sample: Optional['SampleHandler'] = None
+        self._export: Optional['ExportHandler'] = None
 
         # SearchHandler will be initialized when setup_search is called
-        self.search: Optional[SearchHandler] = None
-
-        self.ingest: IngestHandler = IngestHandler(self) 
+        self.search: Optional['SearchHandler'] = None
+
+        # IngestHandler needs no setup, but is also only imported and constructed on first access
+        self._ingest: Optional['IngestHandler'] = None
+
+    @property
+    def edit(self) -> Optional['EditHandler']:
+        if self._edit is _PENDING:
+            from tokensmith.edit import EditHandler
+            self._edit = EditHandler(self)
+        return self._edit
+
+    @edit.setter
+    def edit(self, handler: Optional['EditHandler']):
+        self._edit = handler
+
+    @property
+    def inspect(self) -> Optional['InspectHandler']:
+        if self._inspect is _PENDING:
+            from tokensmith.inspect import InspectHandler
+            self._inspect = InspectHandler(self)
+        return self._inspect
+
+    @inspect.setter
+    def inspect(self, handler: Optional['InspectHandler']):
+        self._inspect = handler
+
+    @property
+    def sample(self) -> Optional['SampleHandler']:
+        if self._sample is _PENDING:
+            from tokensmith.sample import SampleHandler
+            self._sample = SampleHandler(self)
+        return self._sample
+
+    @sample.setter
+    def sample(self, handler: Optional['SampleHandler']):
+        self._sample = handler
+
+    @property
+    def export(self) -> Optional['ExportHandler']:
+        if self._export is _PENDING:
+            from tokensmith.export import ExportHandler
+            self._export = ExportHandler(self)
+        return self._export
+
+    @export.setter
+    def export(self, handler: Optional['ExportHandler']):
+        self._export = handler
+
+    @property
+    def ingest(self) -> 'IngestHandler':
+        if self._ingest is None:
+            from tokensmith.ingest import IngestHandler
+            self._ingest = IngestHandler(self)
+        return self._ingest
+
+    @ingest.setter
+    def ingest(self, handler: 'IngestHandler'):
+        self._ingest = handler
 
     def setup_search(self, bin_file_path: str, search_index_save_path: str, vocab: int, verbose: bool = False, reuse: bool = True):
         """
@@ -44,7 +107,7 @@ class DatasetManager:
             None
         """
         if self.search is None:
-            
+            from tokensmith.search import SearchHandler
             self.search = SearchHandler(
                 bin_file_path=bin_file_path,
                 index_save_path=search_index_save_path,
@@ -89,6 +152,8 @@ class DatasetManager:
             None
         """
 
+        from tokensmith.utils import WriteableMMapIndexedDataset
+
         self.WriteableMMapIndexedDataset = WriteableMMapIndexedDataset(
             dataset_prefix=dataset_prefix,
             batch_info_save_prefix=batch_info_save_prefix,
@@ -102,25 +167,13 @@ class DatasetManager:
             add_extra_token_to_seq=add_extra_token_to_seq
         )
 
-        if self.edit is None:
-            self.edit = EditHandler(self)
-        else:
-            raise ValueError("EditHandler already initialized. Create a new DatasetManager instance or reset `edit` manually.")
-
-        if self.inspect is None:
-            self.inspect = InspectHandler(self)
-        else:
-            raise ValueError("InspectHandler already initialized. Create a new DatasetManager instance or reset `inspect` manually.")
-
-        if self.sample is None:
-            self.sample = SampleHandler(self)
-        else:
-            raise ValueError("SampleHandler already initialized. Create a new DatasetManager instance or reset `sample` manually.")
-
-        if self.export is None:
-            self.export = ExportHandler(self)
-        else:
-            raise ValueError("ExportHandler already initialized. Create a new DatasetManager instance or reset `export` manually.")
-        
+        # Handlers are only marked here; each is imported and constructed on first access
+        for name, handler_name in (("edit", "EditHandler"), ("inspect", "InspectHandler"),
+                                   ("sample", "SampleHandler"), ("export", "ExportHandler")):
+            self._mark_pending(name, handler_name)
 
-    
\ No newline at end of file
+    def _mark_pending(self, name: str, handler_name: str):
+        """Marks the handler stored in `_<name>` for construction on first access, unless it is already initialized."""
+        if getattr(self, f"_{name}") is not None:
+            raise ValueError(f"{handler_name} already initialized. Create a new DatasetManager instance or reset `{name}` manually.")
+        setattr(self, f"_{name}", _PENDING)
@@ -8,6 +8,11 @@ import numpy as np
 import os
 import time
 
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
 logger = logging.getLogger(__name__)
 
 
@@ -16,7 +21,14 @@ def _num_tokens(documents, sizes):
     
     Taken from: https://github.com/EleutherAI/gpt-neox/blob/d12c771198388980ee054617e537665f044e0584/megatron/data/gpt2_dataset.py
     """
-    return np.sum(sizes[documents])
+    documents = np.asarray(documents)
+    if documents.size == 0:
+        return np.int64(0)
+    first, last = int(documents[0]), int(documents[-1])
+    # Splits are contiguous runs of document ids, so sum a view of sizes instead of gathering a copy
+    if last - first + 1 == documents.size and (documents.size == 1 or (np.diff(documents) == 1).all()):
+        return sizes[first:last + 1].sum(dtype=np.int64)
+    return np.take(sizes, documents).sum(dtype=np.int64)
 
 def _num_epochs(tokens_per_epoch, seq_length, num_samples):
     """Based on number of samples and sequence length, calculate how many
@@ -24,16 +36,14 @@ def _num_epochs(tokens_per_epoch, seq_length, num_samples):
     
     Taken from: https://github.com/EleutherAI/gpt-neox/blob/d12c771198388980ee054617e537665f044e0584/megatron/data/gpt2_dataset.py
     """
-    num_epochs = 0
-    total_tokens = 0
-    while True:
-        num_epochs += 1
-        total_tokens += tokens_per_epoch
-        # -1 is because we need to retrieve seq_length + 1 token each time
-        # but the last token will overlap with the first token of the next
-        # sample except for the last sample.
-        if ((total_tokens - 1) // seq_length) >= num_samples:
-            return num_epochs
+    tokens_per_epoch = int(tokens_per_epoch)
+    assert tokens_per_epoch > 0
+    # -1 is because we need to retrieve seq_length + 1 token each time
+    # but the last token will overlap with the first token of the next
+    # sample except for the last sample. So the smallest number of epochs
+    # with (num_epochs * tokens_per_epoch - 1) // seq_length >= num_samples
+    # is the ceiling of (num_samples * seq_length + 1) / tokens_per_epoch.
+    return max(1, -(-(num_samples * seq_length + 1) // tokens_per_epoch))
 
 def _build_doc_idx(documents, num_epochs, np_rng):
     """Build an array with length = number-of-epochs * number-of-documents.
@@ -41,10 +51,8 @@ def _build_doc_idx(documents, num_epochs, np_rng):
     
     Taken from: https://github.com/EleutherAI/gpt-neox/blob/d12c771198388980ee054617e537665f044e0584/megatron/data/gpt2_dataset.py#L416C1-L424C19
     """
-    doc_idx = np.mgrid[0:num_epochs, 0 : len(documents)][1]
-    doc_idx[:] = documents
-    doc_idx = doc_idx.reshape(-1)
-    doc_idx = doc_idx.astype(np.int32)
+    # Same layout as the reference's mgrid grid, built directly as int32 without the int64 intermediate
+    doc_idx = np.tile(np.asarray(documents, dtype=np.int32), num_epochs)
     np_rng.shuffle(doc_idx)
     return doc_idx
 
@@ -60,6 +68,78 @@ def _build_shuffle_idx(size, np_rng):
     np_rng.shuffle(shuffle_idx)
     return shuffle_idx
 
+def _pack_until_overflow_pass(sizes, temp_shuffle_idx, curr_shuffle_idx, running_length, seq_length, allow_chopped,
+                              skip, doc_idx, num_docs, sample_idx, num_sample_starts, num_samples):
+    """Runs the pack_until_overflow packing loop from curr_shuffle_idx until num_samples samples have been
+    started or the end of temp_shuffle_idx is reached, writing into the preallocated doc_idx and sample_idx.
+    doc_idx must have room for len(temp_shuffle_idx) more entries.
+
+    Returns the updated (curr_shuffle_idx, running_length, num_docs, num_sample_starts).
+    """
+    while num_sample_starts < num_samples and curr_shuffle_idx < len(temp_shuffle_idx):
+        doc = temp_shuffle_idx[curr_shuffle_idx]
+        curr_shuffle_idx += 1
+        # +1 since we shift left/right by 1
+        if (not allow_chopped and sizes[doc] > seq_length + 1) or skip[doc]:
+            continue
+        doc_length = sizes[doc]
+        if running_length == 0:
+            sample_idx[num_sample_starts, 0] = num_docs
+            sample_idx[num_sample_starts, 1] = 0
+            num_sample_starts += 1
+            running_length += doc_length
+        elif running_length + doc_length > (seq_length + 1):
+            running_length = doc_length
+            sample_idx[num_sample_starts, 0] = num_docs
+            sample_idx[num_sample_starts, 1] = 0
+            num_sample_starts += 1
+        else:
+            running_length += doc_length
+        doc_idx[num_docs] = doc
+        num_docs += 1
+    return curr_shuffle_idx, running_length, num_docs, num_sample_starts
+
+# Compiled once and cached on disk when numba is available; the packing loop runs once per document visited,
+# which is slow in the interpreter. Without numba the same loop still runs on preallocated buffers.
+_pack_until_overflow_pass_impl = njit(cache=True)(_pack_until_overflow_pass) if njit is not None else _pack_until_overflow_pass
+
+def _build_pack_until_overflow_idx(num_documents, sizes, num_samples, seq_length, allow_chopped, skip, np_rng):
+    """Builds doc-idx and sample-idx for pack_until_overflow into preallocated buffers with the (compiled, if possible)
+    packing loop, reshuffling the documents with np_rng between passes exactly like the reference loop."""
+    temp_shuffle_idx = np.arange(num_documents)
+    np_rng.shuffle(temp_shuffle_idx)
+
+    # Each pass over the shuffled documents adds at most num_documents entries to doc_idx
+    doc_idx = np.empty(num_documents, dtype=np.int64)
+    sample_idx = np.empty((num_samples + 1, 2), dtype=np.int64)
+    curr_shuffle_idx, running_length, num_docs, num_sample_starts = 0, 0, 0, 0
+    while True:
+        if len(doc_idx) < num_docs + num_documents:
+            doc_idx = np.resize(doc_idx, max(2 * len(doc_idx), num_docs + num_documents))
+        num_docs_before = num_docs
+        curr_shuffle_idx, running_length, num_docs, num_sample_starts = _pack_until_overflow_pass_impl(
+            sizes, temp_shuffle_idx, curr_shuffle_idx, running_length, seq_length, allow_chopped,
+            skip, doc_idx, num_docs, sample_idx, num_sample_starts, num_samples
+        )
+        if num_sample_starts >= num_samples:
+            break
+        if num_docs == num_docs_before:
+            raise ValueError("No document can be packed: every document is either longer than seq_length + 1 "
+                             "(with allow_chopped False) or has no trainable labels.")
+        curr_shuffle_idx = 0
+        np_rng.shuffle(temp_shuffle_idx)
+    sample_idx[num_sample_starts] = (num_docs, 0)
+    return doc_idx[:num_docs], sample_idx[:num_sample_starts + 1]
+
+def _build_label_skip_mask(label_dataset, num_documents, length):
+    """Marks the documents whose first `length` labels are all -100 (nothing to train on), reading each document's
+    labels once instead of once per visit in the packing loops. Nothing is skipped without a label dataset."""
+    skip = np.zeros(num_documents, dtype=np.bool_)
+    if label_dataset is not None:
+        for doc in range(num_documents):
+            skip[doc] = np.all(label_dataset.get(doc)[:length] == -100)
+    return skip
+
 def build_index_mappings(
     name,
     data_prefix,
@@ -164,46 +244,11 @@ def build_index_mappings(
             # Naively pack data until it overflows, then roll it over to a new one instead.
             shuffle_idx = np.arange(num_samples)  # Shuffle index around epochs
             np_rng.shuffle(shuffle_idx)
-            sample_idx = []
-            doc_idx = []
-            # Iterate over files until we have enough samples.
-            temp_shuffle_idx = np.arange(len(documents))
-            np_rng.shuffle(temp_shuffle_idx)
-            running_length = 0
-            curr_shuffle_idx = 0
-            while len(sample_idx) < num_samples:
-                if not allow_chopped:
-                    # +1 since we shift left/right by 1
-                    if sizes[temp_shuffle_idx[curr_shuffle_idx]] > seq_length + 1:
-                        curr_shuffle_idx += 1
-                        continue
-                # First, check if we need to skip this item...
-                if label_dataset is not None:
-                    if np.all(
-                        label_dataset.get(temp_shuffle_idx[curr_shuffle_idx])[
-                            : seq_length + 1
-                        ]
-                        == -100
-                    ):
-                        curr_shuffle_idx += 1
-                        continue
-                doc_length = sizes[temp_shuffle_idx[curr_shuffle_idx]]
-                if running_length == 0:
-                    sample_idx.append(np.array([len(doc_idx), 0]))
-                    doc_idx.append(temp_shuffle_idx[curr_shuffle_idx])
-                    running_length += doc_length
-                else:
-                    if running_length + doc_length > (seq_length + 1):
-                        running_length = doc_length
-                        sample_idx.append(np.array([len(doc_idx), 0]))
-                    else:
-                        running_length += doc_length
-                    doc_idx.append(temp_shuffle_idx[curr_shuffle_idx])
-                curr_shuffle_idx += 1
-                if curr_shuffle_idx == len(documents):
-                    curr_shuffle_idx = 0
-                    np_rng.shuffle(temp_shuffle_idx)
-            sample_idx.append(np.array([len(doc_idx), 0]))
+            # Documents with no trainable labels are skipped
+            skip = _build_label_skip_mask(label_dataset, len(documents), seq_length + 1)
+            doc_idx, sample_idx = _build_pack_until_overflow_idx(
+                len(documents), sizes, num_samples, seq_length, allow_chopped, skip, np_rng
+            )
             np.save(doc_idx_filename, doc_idx, allow_pickle=True)
             np.save(sample_idx_filename, sample_idx, allow_pickle=True)
             np.save(shuffle_idx_filename, shuffle_idx, allow_pickle=True)
@@ -212,22 +257,19 @@ def build_index_mappings(
             shuffle_idx = np.arange(num_samples)  # Shuffle index around epochs
             np_rng.shuffle(shuffle_idx)
             sample_idx = np.zeros((num_samples + 1, 2), dtype=np.int64)
-            sample_idx[:, 0] = np.array([i for i in range(num_samples + 1)])
-            sample_idx[:, 1] = 0
-            doc_idx = list()
-            doc_i = 0
-            while len(doc_idx) <= num_samples:
-                if not allow_chopped:
-                    # +1 since we shift left/right by 1
-                    if sizes[doc_i] > seq_length + 1:
-                        doc_i = (doc_i + 1) % len(documents)
-                        continue
-                # Just in case we have bad data in the loop...
-                if np.all(label_dataset.get(doc_i)[:seq_length] == -100):
-                    doc_i = (doc_i + 1) % len(documents)
-                    continue
-                doc_idx.append(doc_i)
-                doc_i = (doc_i + 1) % len(documents)
+            # Offsets stay 0 from np.zeros
+            sample_idx[:, 0] = np.arange(num_samples + 1, dtype=np.int64)
+            # Skip documents without trainable labels, just in case we have bad data
+            valid = ~_build_label_skip_mask(label_dataset, len(documents), seq_length)
+            if not allow_chopped:
+                # +1 since we shift left/right by 1
+                valid &= sizes[:len(documents)] <= seq_length + 1
+            valid_docs = np.flatnonzero(valid)
+            if valid_docs.size == 0:
+                raise ValueError("No document can be used: every document is either longer than seq_length + 1 "
+                                 "(with allow_chopped False) or has no trainable labels.")
+            # Cycle through the usable documents in order until there is one per sample boundary
+            doc_idx = np.resize(valid_docs.astype(np.int64), num_samples + 1)
             np.save(doc_idx_filename, doc_idx, allow_pickle=True)
             np.save(sample_idx_filename, sample_idx, allow_pickle=True)
             np.save(shuffle_idx_filename, shuffle_idx, allow_pickle=True)
@@ -237,25 +279,17 @@ def get_train_valid_test_split_(splits_string, size):
     
     Taken from: https://github.com/EleutherAI/gpt-neox/blob/d12c771198388980ee054617e537665f044e0584/megatron/data/data_utils.py#L242
     """
-    splits = []
-    if splits_string.find(",") != -1:
-        splits = [float(s) for s in splits_string.split(",")]
-    elif splits_string.find("/") != -1:
-        splits = [float(s) for s in splits_string.split("/")]
-    else:
-        splits = [float(splits_string)]
-    while len(splits) < 3:
-        splits.append(0.0)
-    splits = splits[:3]
-    splits_sum = sum(splits)
+    # Commas take precedence over slashes, as in the reference implementation
+    separator = "," if "," in splits_string else "/"
+    splits = np.zeros(3, dtype=np.float64)
+    parsed = [float(s) for s in splits_string.split(separator)][:3]
+    splits[:len(parsed)] = parsed
+    splits_sum = splits.sum()
     assert splits_sum > 0.0
-    splits = [split / splits_sum for split in splits]
-    splits_index = [0]
-    for index, split in enumerate(splits):
-        splits_index.append(splits_index[index] + int(round(split * float(size))))
-    diff = splits_index[-1] - size
-    for index in range(1, len(splits_index)):
-        splits_index[index] -= diff
-    assert len(splits_index) == 4
+    splits /= splits_sum
+    # np.rint rounds half to even like the reference's round()
+    splits_index = np.zeros(4, dtype=np.int64)
+    np.cumsum(np.rint(splits * float(size)).astype(np.int64), out=splits_index[1:])
+    splits_index[1:] -= splits_index[-1] - size
     assert splits_index[-1] == size
-    return splits_index
+    return splits_index.tolist()
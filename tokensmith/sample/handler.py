@@ -1,6 +1,8 @@
-from typing import TYPE_CHECKING, Union, List, Dict, Tuple, Optional, Any
+from typing import TYPE_CHECKING, Union, List, Dict, Tuple, Optional, Any, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+import logging
 import numpy as np
-from ..utils import generate_training_sample
+from ..utils import generate_training_sample, generate_training_samples
 
 try:
     from transformers import AutoTokenizer
@@ -10,25 +12,35 @@ except ImportError:
 if TYPE_CHECKING:
     from ..manager import DatasetManager  # only used for type hints, won't cause import loop
 
+logger = logging.getLogger(__name__)
+
+def _log_prefetch_error(future: Future) -> None:
+    """Logs a failed background prefetch, which would otherwise be dropped with its never-awaited future."""
+    error = future.exception()
+    if error is not None:
+        logger.warning(f"Background prefetch failed: {error!r}")
+
 class SampleHandler:
     def __init__(self, manager: 'DatasetManager'):
         self.manager = manager
 
     def get_samples_by_indices(
         self, 
-        indices: List[int], 
+        indices: Union[List[int], range, np.ndarray], 
         return_doc_details: bool = False,
         return_detokenized: bool = False,
         tokenizer: Optional[Any] = None,
+        batch_decode: bool = True,
     ) -> Union[List[List[np.ndarray]], List[str], List[Tuple[List[np.ndarray], Dict]], List[Tuple[str, Dict]]]:
         """
         Returns a list of samples by their indices, optionally with document details and/or detokenized.
 
         Parameters:
-            indices (List[int]): List of sample indices to retrieve.
+            indices (Union[List[int], range, np.ndarray]): List, range or integer array of sample indices to retrieve.
             return_doc_details (bool): If True, includes associated document details.
             return_detokenized (bool): If True, returns detokenized text instead of token arrays.
             tokenizer: The tokenizer to use for detokenization (required if return_detokenized is True).
+            batch_decode (bool): If True, detokenizes all samples with one `tokenizer.batch_decode` call (when available) instead of one `decode` call per sample.
 
         Raises:
             ValueError: If indices is not a list of non-negative integers or if tokenizer is None when return_detokenized is True.
@@ -39,38 +51,85 @@ class SampleHandler:
             List[Tuple[List[np.ndarray], Dict]]: A list of tuples containing token sequences and document details (if return_detokenized is False and return_doc_details is True).
             List[Tuple[str, Dict]]: A list of tuples containing detokenized text and document details (if return_detokenized is True and return_doc_details is True).
         """
-        if not isinstance(indices, list):
+        if isinstance(indices, range):
+            # A range only holds integers and its smallest element is at one of its ends
+            if len(indices) and min(indices[0], indices[-1]) < 0:
+                raise ValueError("All elements in indices must be non-negative integers.")
+        elif isinstance(indices, (list, np.ndarray)):
+            # One C-level conversion replaces separate per-element type and sign scans
+            indices = np.asarray(indices) if len(indices) else np.empty(0, dtype=np.int64)
+            if indices.ndim != 1 or indices.dtype.kind not in "iu":
+                raise ValueError("All elements in indices must be integers.")
+            if (indices < 0).any():
+                raise ValueError("All elements in indices must be non-negative integers.")
+        else:
             raise ValueError("indices must be a list.")
-        if not all(isinstance(i, int) for i in indices):
-            raise ValueError("All elements in indices must be integers.")
-        if not all(i >= 0 for i in indices):
-            raise ValueError("All elements in indices must be non-negative integers.")
 
         if return_detokenized and tokenizer is None:
             raise ValueError("tokenizer must be provided if return_detokenized is True.")
 
-        samples = []
-        for index in indices:
-            response = self.manager.WriteableMMapIndexedDataset.get_example_by_id(
-                example_loc=index,
-                return_doc_details=return_doc_details
-            )
-
-            if return_doc_details:
-                output_seq, doc_details = response
+        dataset = self.manager.WriteableMMapIndexedDataset
+        if isinstance(indices, range) and indices.step == 1:
+            # Contiguous locations (e.g. chunked exports) are looked up and read in one pass
+            responses = dataset.get_examples_by_range(indices.start, indices.stop, return_doc_details=return_doc_details)
+        else:
+            # Arbitrary locations are looked up together and read in corpus order, then returned in the given order
+            responses = dataset.get_examples_by_ids(indices, return_doc_details=return_doc_details)
+
+        if return_doc_details:
+            output_seqs = [output_seq for output_seq, _ in responses]
+        else:
+            output_seqs = responses
+
+        # Detokenize the whole set of samples in one batched call
+        if return_detokenized:
+            if batch_decode:
+                output_seqs = generate_training_samples(output_seqs, tokenizer)
             else:
-                output_seq = response
-                doc_details = None
+                output_seqs = [generate_training_sample(output_seq, tokenizer) for output_seq in output_seqs]
 
-            if return_detokenized:
-                output_seq = generate_training_sample(output_seq, tokenizer)
+        if return_doc_details:
+            return [(output_seq, doc_details) for output_seq, (_, doc_details) in zip(output_seqs, responses)]
+        return output_seqs
 
-            if return_doc_details:
-                samples.append((output_seq, doc_details))
-            else:
-                samples.append(output_seq)
+    def iter_samples_by_indices(
+        self,
+        indices: Union[List[int], range, np.ndarray],
+        return_doc_details: bool = False,
+        return_detokenized: bool = False,
+        tokenizer: Optional[Any] = None,
+        chunk_size: int = 1000,
+        batch_decode: bool = True,
+    ) -> Iterator[Union[List[np.ndarray], str, Tuple[List[np.ndarray], Dict], Tuple[str, Dict]]]:
+        """
+        Lazily yields samples by their indices, fetching (and detokenizing) `chunk_size` samples at a time.
+        Yields the same items as get_samples_by_indices returns, but only one chunk is held in memory.
 
-        return samples
+        Parameters:
+            indices (Union[List[int], range, np.ndarray]): List, range or integer array of sample indices to retrieve.
+            return_doc_details (bool): If True, includes associated document details.
+            return_detokenized (bool): If True, yields detokenized text instead of token arrays.
+            tokenizer: The tokenizer to use for detokenization (required if return_detokenized is True).
+            chunk_size (int): Number of samples fetched per call to get_samples_by_indices.
+            batch_decode (bool): If True, each chunk is detokenized with one `tokenizer.batch_decode` call (when available).
+
+        Raises:
+            ValueError: If chunk_size is not a positive integer, or for the same reasons as get_samples_by_indices.
+
+        Yields:
+            One sample per index, in the format described in get_samples_by_indices.
+        """
+        if not isinstance(chunk_size, int) or chunk_size <= 0:
+            raise ValueError("chunk_size must be a positive integer.")
+
+        for chunk_start in range(0, len(indices), chunk_size):
+            yield from self.get_samples_by_indices(
+                indices=indices[chunk_start:chunk_start + chunk_size],
+                return_doc_details=return_doc_details,
+                return_detokenized=return_detokenized,
+                tokenizer=tokenizer,
+                batch_decode=batch_decode
+            )
 
     def get_batches_by_ids(
         self,
@@ -109,20 +168,29 @@ class SampleHandler:
         if return_detokenized and tokenizer is None:
             raise ValueError("tokenizer must be provided if return_detokenized is True.")
 
-        # Collect samples organized by batch
+        # Collect samples organized by batch, warming the page cache for the next batch in the
+        # background while the current one is read and detokenized
         batches = []
-        for batch_id in batch_ids:
-            batch_indices = [i for i in range(batch_id * batch_size, (batch_id + 1) * batch_size)]
-            batch_samples = self.get_samples_by_indices(
-                indices=batch_indices,
-                return_doc_details=return_doc_details,
-                return_detokenized=return_detokenized,
-                tokenizer=tokenizer
-            )
-            batches.append(batch_samples)
+        with ThreadPoolExecutor(max_workers=1) as prefetcher:
+            for position, batch_id in enumerate(batch_ids):
+                if position + 1 < len(batch_ids):
+                    self._prefetch(prefetcher, range(batch_ids[position + 1] * batch_size, (batch_ids[position + 1] + 1) * batch_size))
+                batch_indices = range(batch_id * batch_size, (batch_id + 1) * batch_size)
+                batch_samples = self.get_samples_by_indices(
+                    indices=batch_indices,
+                    return_doc_details=return_doc_details,
+                    return_detokenized=return_detokenized,
+                    tokenizer=tokenizer
+                )
+                batches.append(batch_samples)
 
         return batches
 
+    def _prefetch(self, prefetcher: ThreadPoolExecutor, indices: Union[List[int], range, np.ndarray]) -> None:
+        """Submits a page-cache prefetch of the given sample locations to prefetcher. Only a hint, so it is never waited on."""
+        future = prefetcher.submit(self.manager.WriteableMMapIndexedDataset.prefetch_examples, indices)
+        future.add_done_callback(_log_prefetch_error)
+
     def get_samples_by_policy(
         self,
         policy_fn: callable,
@@ -207,15 +275,18 @@ class SampleHandler:
             raise ValueError("policy_fn must return a list of integers.")
 
         batches = []
-        for batch_id in batch_ids:
-            # Get indices for this single batch
-            indices = [i for i in range(batch_id * batch_size, (batch_id + 1) * batch_size)]
-            batch = self.get_samples_by_indices(
-                indices=indices,
-                return_doc_details=return_doc_details,
-                return_detokenized=return_detokenized,
-                tokenizer=tokenizer
-            )
-            batches.append(batch)
+        with ThreadPoolExecutor(max_workers=1) as prefetcher:
+            for position, batch_id in enumerate(batch_ids):
+                if position + 1 < len(batch_ids):
+                    self._prefetch(prefetcher, range(batch_ids[position + 1] * batch_size, (batch_ids[position + 1] + 1) * batch_size))
+                # Get indices for this single batch
+                indices = range(batch_id * batch_size, (batch_id + 1) * batch_size)
+                batch = self.get_samples_by_indices(
+                    indices=indices,
+                    return_doc_details=return_doc_details,
+                    return_detokenized=return_detokenized,
+                    tokenizer=tokenizer
+                )
+                batches.append(batch)
 
         return batches
\ No newline at end of file
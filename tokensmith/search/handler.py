@@ -1,10 +1,123 @@
 # Heavily inspired by the original code from https://github.com/EleutherAI/tokengrams/blob/master/tokengrams/tokengrams.pyi and uses the same library.
 
-from tokengrams import MemmapIndex
-from typing import List
+from typing import Callable, List, Tuple, Union
+from itertools import chain
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+import numpy as np
 import os
 import logging
 
+try:
+    from tokengrams import MemmapIndex
+except ImportError:
+    MemmapIndex = None
+
+def _is_integer_array(tokens: list) -> bool:
+    """Checks that every element of a non-empty list is an integer with one C-level conversion instead of a Python loop."""
+    try:
+        array = np.asarray(tokens)
+    except (OverflowError, ValueError):
+        array = None
+    if array is None or array.dtype.kind == "O" or array.ndim != 1:
+        # Mixed types, nested lists or integers too large for int64 fall back to the per-element check
+        return all(isinstance(token, int) for token in tokens)
+    return array.dtype.kind in "iub"
+
+def _is_token_array(tokens: np.ndarray) -> bool:
+    return tokens.ndim == 1 and tokens.dtype.kind in "iu"
+
+def _validate_query(query: Union[List[int], np.ndarray]) -> List[int]:
+    """
+    Raises a ValueError unless query is a non-empty list of integers or a non-empty 1-D integer array.
+    Arrays are already typed, so they skip the element check and are only converted to the list tokengrams expects.
+    """
+    if isinstance(query, np.ndarray):
+        if not _is_token_array(query):
+            raise ValueError("All elements in query must be integers.")
+        if query.size == 0:
+            raise ValueError("query cannot be an empty list.")
+        return query.tolist()
+    if not isinstance(query, list):
+        raise ValueError("query must be a list of integers.")
+    if len(query) == 0:
+        raise ValueError("query cannot be an empty list.")
+    if not _is_integer_array(query):
+        raise ValueError("All elements in query must be integers.")
+    return query
+
+def _validate_queries(queries: Union[List[List[int]], List[np.ndarray], np.ndarray]) -> List[List[int]]:
+    """
+    Raises a ValueError unless queries is a list of non-empty lists of integers or 1-D integer arrays,
+    or a 2-D integer array with one query per row. Returns the queries as lists.
+    """
+    if isinstance(queries, np.ndarray):
+        if queries.ndim != 2 or queries.dtype.kind not in "iu":
+            raise ValueError("All elements in queries must be integers.")
+        if queries.shape[1] == 0:
+            raise ValueError("None of the queries can be an empty list.")
+        return queries.tolist()
+    if not isinstance(queries, list):
+        raise ValueError("queries must be a list of lists of integers.")
+    if not all(isinstance(query, (list, np.ndarray)) for query in queries):
+        raise ValueError("All elements in queries must be lists of integers.")
+    arrays = [query for query in queries if isinstance(query, np.ndarray)]
+    if not all(_is_token_array(query) for query in arrays):
+        raise ValueError("All elements in queries must be integers.")
+    # All list queries are checked together as one flat array
+    tokens = list(chain.from_iterable(query for query in queries if isinstance(query, list)))
+    if tokens and not _is_integer_array(tokens):
+        raise ValueError("All elements in queries must be integers.")
+    if any(len(query) == 0 for query in queries):
+        raise ValueError("None of the queries can be an empty list.")
+    if arrays:
+        return [query.tolist() if isinstance(query, np.ndarray) else query for query in queries]
+    return queries
+
+def _validate_num_workers(num_workers: int):
+    if not isinstance(num_workers, int) or num_workers < 1:
+        raise ValueError("num_workers must be a positive integer.")
+
+def _map_in_chunks(batch_fn: Callable[[List[List[int]]], list], queries: List[List[int]], num_workers: int) -> list:
+    """Runs batch_fn over num_workers contiguous chunks of queries on a thread pool and joins the results in order."""
+    if num_workers == 1 or len(queries) < 2:
+        return batch_fn(queries)
+    chunk_size = -(-len(queries) // num_workers)
+    chunks = [queries[start:start + chunk_size] for start in range(0, len(queries), chunk_size)]
+    with ThreadPoolExecutor(max_workers=len(chunks)) as pool:
+        return list(chain.from_iterable(pool.map(batch_fn, chunks)))
+
+def _map_unique(batch_fn: Callable[[List[List[int]]], list], queries: List[List[int]], num_workers: int) -> list:
+    """Runs batch_fn once per distinct query and scatters the results back to every position of that query.
+    Repeats get their own copy of the result so callers can modify them independently."""
+    unique_positions = {}
+    positions = [unique_positions.setdefault(tuple(query), len(unique_positions)) for query in queries]
+    if len(unique_positions) == len(queries):
+        return _map_in_chunks(batch_fn, queries, num_workers)
+    unique_results = _map_in_chunks(batch_fn, [list(query) for query in unique_positions], num_workers)
+    results = []
+    seen = [False] * len(unique_results)
+    for position in positions:
+        results.append(list(unique_results[position]) if seen[position] else unique_results[position])
+        seen[position] = True
+    return results
+
+# Number of distinct queries whose count_next / get_smoothed_probs results are kept per SearchHandler.
+# Each entry is a vocab-length array (512 KiB for a 2**16 vocabulary), so this stays small.
+_QUERY_CACHE_SIZE = 64
+
+def _read_only(array: np.ndarray) -> np.ndarray:
+    array.setflags(write=False)
+    return array
+
+def _count_next_array(index: MemmapIndex, query: Tuple[int, ...]) -> np.ndarray:
+    """count_next of query as a read-only uint64 array, which holds the counts exactly in 8 bytes each."""
+    return _read_only(np.asarray(index.count_next(list(query)), dtype=np.uint64))
+
+def _smoothed_probs_array(index: MemmapIndex, query: Tuple[int, ...], k: int) -> np.ndarray:
+    """get_smoothed_probs of query as a read-only float64 array, which holds the probabilities exactly in 8 bytes each."""
+    return _read_only(np.asarray(index.get_smoothed_probs(list(query), k), dtype=np.float64))
+
 class SearchHandler:
     def __init__(self, bin_file_path: str, index_save_path: str, vocab: int, verbose: bool = True, reuse: bool = True):
 
@@ -14,9 +127,15 @@ class SearchHandler:
         self.verbose = verbose
         self.reuse = reuse
 
+        if MemmapIndex is None:
+            raise ValueError("tokengrams must be installed to use SearchHandler")
+
         if vocab not in [2**16, 2**32]:
             raise ValueError("vocab must be either 2**16 or 2**32. Set it to 2**16 if your token vocabulary is less than 2**16, or 2**32 if it is larger than that.")
 
+        # Token type of the bin file, fixed by the vocabulary size
+        self.token_dtype = np.dtype(np.uint16 if vocab == 2**16 else np.uint32)
+
         if reuse:
             if os.path.exists(os.path.join(self.index_save_path)):
                 logging.info("Reusing existing index.")
@@ -39,99 +158,106 @@ class SearchHandler:
 
         assert self.index.is_sorted(), "The index is not sorted. This is not expected. Please rerun the index creation process."
 
-    def count(self, query: List[int]) -> int:
+        # Repeated probes of the same context (common in the UI) are answered from per-instance LRU caches
+        # keyed on the query tuple. They store compact read-only arrays and return fresh lists, so callers
+        # cannot modify the cached results. The caches are bound to the index rather than to self, which
+        # avoids a reference cycle that would keep the handler and its memory-mapped index alive.
+        self._count_next_cached = lru_cache(maxsize=_QUERY_CACHE_SIZE)(partial(_count_next_array, self.index))
+        self._smoothed_probs_cached = lru_cache(maxsize=_QUERY_CACHE_SIZE)(partial(_smoothed_probs_array, self.index))
+
+    def count(self, query: Union[List[int], np.ndarray]) -> int:
         """Counts the occurrences of a query in the index."""
-        if not isinstance(query, list):
-            raise ValueError("query must be a list of integers.")
-        if not all(isinstance(token, int) for token in query):
-            raise ValueError("All elements in query must be integers.")
-        if len(query) == 0:
-            raise ValueError("query cannot be an empty list.")
+        query = _validate_query(query)
         return self.index.count(query)
 
-    def contains(self, query: List[int]) -> bool:
+    def contains(self, query: Union[List[int], np.ndarray]) -> bool:
         """Checks if a query is present in the index."""
-        if not isinstance(query, list):
-            raise ValueError("query must be a list of integers.")
-        if not all(isinstance(token, int) for token in query):
-            raise ValueError("All elements in query must be integers.")
-        if len(query) == 0:
-            raise ValueError("query cannot be an empty list.")
+        query = _validate_query(query)
         return self.index.contains(query)
 
-    def positions(self, query: List[int]) -> List[int]:
-        """Returns an unordered list of positions where `query` starts in `tokens`."""
-        if not isinstance(query, list):
-            raise ValueError("query must be a list of integers.")
-        if not all(isinstance(token, int) for token in query):
-            raise ValueError("All elements in query must be integers.")
-        if len(query) == 0:
-            raise ValueError("query cannot be an empty list.")
-        return self.index.positions(query)
+    def positions(self, query: Union[List[int], np.ndarray], prefetch_bytes: int = 0) -> List[int]:
+        """Returns an unordered list of positions where `query` starts in `tokens`.
+        If prefetch_bytes is positive, also hints the OS to read that many bytes of the bin file from each position
+        into the page cache, so reading the matches afterwards does not fault in one page at a time."""
+        query = _validate_query(query)
+        if not isinstance(prefetch_bytes, int) or prefetch_bytes < 0:
+            raise ValueError("prefetch_bytes must be a non-negative integer.")
+        positions = self.index.positions(query)
+        if prefetch_bytes and positions:
+            self._prefetch_positions(positions, prefetch_bytes)
+        return positions
+
+    def positions_np(self, query: Union[List[int], np.ndarray], prefetch_bytes: int = 0) -> np.ndarray:
+        """Same as `positions`, but returns the positions as an int64 array, which takes 8 bytes per position instead of
+        a Python int object each. Prefer this for frequent queries whose positions are processed with NumPy."""
+        positions = self.positions(query, prefetch_bytes=prefetch_bytes)
+        return np.fromiter(positions, dtype=np.int64, count=len(positions))
 
-    def count_next(self, query: List[int]) -> List[int]:
+    def _prefetch_positions(self, positions: List[int], prefetch_bytes: int):
+        """Issues one POSIX_FADV_WILLNEED hint per run of overlapping byte ranges. Does nothing without `os.posix_fadvise`."""
+        if not hasattr(os, "posix_fadvise"):
+            return
+        starts = np.sort(np.asarray(positions, dtype=np.int64)) * self.token_dtype.itemsize
+        ends = starts + prefetch_bytes
+        # A new run starts wherever a range begins after everything before it has ended
+        run_breaks = np.flatnonzero(starts[1:] > np.maximum.accumulate(ends)[:-1]) + 1
+        run_starts = starts[np.concatenate(([0], run_breaks))]
+        run_ends = np.maximum.reduceat(ends, np.concatenate(([0], run_breaks)))
+        fd = os.open(self.bin_file_path, os.O_RDONLY)
+        try:
+            for start, end in zip(run_starts.tolist(), run_ends.tolist()):
+                os.posix_fadvise(fd, start, end - start, os.POSIX_FADV_WILLNEED)
+        finally:
+            os.close(fd)
+
+    def count_next(self, query: Union[List[int], np.ndarray]) -> List[int]:
         """Count the occurrences of each token directly following `query`."""
-        if not isinstance(query, list):
-            raise ValueError("query must be a list of integers.")
-        if not all(isinstance(token, int) for token in query):
-            raise ValueError("All elements in query must be integers.")
-        if len(query) == 0:
-            raise ValueError("query cannot be an empty list.")
-        return self.index.count_next(query)
-
-    def batch_count_next(self, queries: List[List[int]]) -> List[List[int]]:
-        """Count the occurrences of each token directly following each query in a batch."""
-        if not isinstance(queries, list):
-            raise ValueError("queries must be a list of lists of integers.")
-        if not all(isinstance(query, list) for query in queries):
-            raise ValueError("All elements in queries must be lists of integers.")
-        if not all(all(isinstance(token, int) for token in query) for query in queries):
-            raise ValueError("All elements in queries must be integers.")
-        if any(len(query) == 0 for query in queries):
-            raise ValueError("None of the queries can be an empty list.")
-        return self.index.batch_count_next(queries)
+        query = _validate_query(query)
+        return self._count_next_cached(tuple(query)).tolist()
 
-    def sample_smoothed(self, query: List[int], n: int, k: int, num_samples: int) -> List[List[int]]:
+    def batch_count_next(self, queries: Union[List[List[int]], np.ndarray], num_workers: int = 1) -> List[List[int]]:
+        """Count the occurrences of each token directly following each query in a batch. Repeated queries are only searched once.
+        With num_workers > 1 the batch is split into that many chunks that are searched on separate threads."""
+        queries = _validate_queries(queries)
+        _validate_num_workers(num_workers)
+        return _map_unique(self.index.batch_count_next, queries, num_workers)
+
+    def sample_smoothed(self, query: Union[List[int], np.ndarray], n: int, k: int, num_samples: int) -> List[List[int]]:
         """Sample `num_samples` sequences of length `k` that follow `query` based on previous (n- 1) characters (n-gram prefix). Uses a Kneser-New smoothed conditional distribution. If less than (n - 1) characters are available, it uses all available characters."""
-        if not isinstance(query, list):
-            raise ValueError("query must be a list of integers.")
-        if not all(isinstance(token, int) for token in query):
-            raise ValueError("All elements in query must be integers.")
-        if len(query) == 0:
-            raise ValueError("query cannot be an empty list.")
+        query = _validate_query(query)
         return self.index.sample_smoothed(query, n, k, num_samples)
 
-    def sample_unsmoothed(self, query: List[int], k: int, num_samples: int) -> List[List[int]]:
+    def sample_unsmoothed(self, query: Union[List[int], np.ndarray], k: int, num_samples: int) -> List[List[int]]:
         """Sample `num_samples` sequences of length `k` that follow `query` based on previous characters (n-gram prefix). If less than (n - 1) characters are available, it uses all available characters."""
-        if not isinstance(query, list):
-            raise ValueError("query must be a list of integers.")
-        if not all(isinstance(token, int) for token in query):
-            raise ValueError("All elements in query must be integers.")
-        if len(query) == 0:
-            raise ValueError("query cannot be an empty list.")
+        query = _validate_query(query)
         return self.index.sample_unsmoothed(query, k, num_samples)
 
-    def get_smoothed_probs(self, query: List[int], k: int) -> List[float]:
+    def get_smoothed_probs(self, query: Union[List[int], np.ndarray], k: int) -> List[float]:
         """Get the interpolated Kneser-Ney smoothed token probability distribution using all previous tokens in the query."""
-        if not isinstance(query, list):
-            raise ValueError("query must be a list of integers.")
-        if not all(isinstance(token, int) for token in query):
-            raise ValueError("All elements in query must be integers.")
-        if len(query) == 0:
-            raise ValueError("query cannot be an empty list.")
-        return self.index.get_smoothed_probs(query, k)
+        query = _validate_query(query)
+        return self._smoothed_probs_cached(tuple(query), k).tolist()
     
-    def batch_get_smoothed_probs(self, queries: List[List[int]], k: int) -> List[List[float]]:
-        """Get the interpolated Kneser-Ney smoothed token probability distribution using all previous tokens in each query."""
-        if not isinstance(queries, list):
-            raise ValueError("queries must be a list of lists of integers.")
-        if not all(isinstance(query, list) for query in queries):
-            raise ValueError("All elements in queries must be lists of integers.")
-        if not all(all(isinstance(token, int) for token in query) for query in queries):
-            raise ValueError("All elements in queries must be integers.")
-        if any(len(query) == 0 for query in queries):
-            raise ValueError("None of the queries can be an empty list.")
-        return self.index.batch_get_smoothed_probs(queries, k)
+    def batch_get_smoothed_probs(self, queries: Union[List[List[int]], np.ndarray], k: int, num_workers: int = 1) -> List[List[float]]:
+        """Get the interpolated Kneser-Ney smoothed token probability distribution using all previous tokens in each query.
+        Repeated queries are only evaluated once. With num_workers > 1 the batch is split into that many chunks that are evaluated on separate threads."""
+        queries = _validate_queries(queries)
+        _validate_num_workers(num_workers)
+        return _map_unique(lambda chunk: self.index.batch_get_smoothed_probs(chunk, k), queries, num_workers)
+
+    def batch_top_k_next(self, queries: Union[List[List[int]], np.ndarray], k: int, top_k: int, num_workers: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """Get the top_k most likely next tokens under the smoothed distribution of each query in a batch, most likely first.
+        Returns a (len(queries), top_k) array of token ids and a matching array of probabilities."""
+        if not isinstance(top_k, int) or top_k < 1:
+            raise ValueError("top_k must be a positive integer.")
+        probs = np.asarray(self.batch_get_smoothed_probs(queries, k, num_workers=num_workers), dtype=np.float32)
+        if probs.size == 0:
+            return np.empty((len(probs), 0), dtype=np.uint32), np.empty((len(probs), 0), dtype=np.float32)
+        top_k = min(top_k, probs.shape[1])
+        # Partition every row at once, then sort only the top_k winners of each row
+        top_idx = np.argpartition(probs, -top_k, axis=1)[:, -top_k:]
+        top_probs = np.take_along_axis(probs, top_idx, axis=1)
+        order = np.argsort(-top_probs, axis=1, kind="stable")
+        return np.take_along_axis(top_idx, order, axis=1).astype(np.uint32), np.take_along_axis(top_probs, order, axis=1)
 
     def estimate_delta(self, n: int) -> None:
         """Warning: O(k**n) where k is vocabulary size, use with caution.
@@ -140,4 +266,6 @@ class SearchHandler:
         https://people.eecs.berkeley.edu/~klein/cs294-5/chen_goodman.pdf, page 16."""
         if not isinstance(n, int):
             raise ValueError("n must be an integer.")
-        self.index.estimate_delta(n)
\ No newline at end of file
+        self.index.estimate_delta(n)
+        # New deltas change every smoothed distribution
+        self._smoothed_probs_cached.cache_clear()
\ No newline at end of file
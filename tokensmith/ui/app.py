@@ -1,5 +1,7 @@
 import streamlit as st
 import argparse
+import logging
+from concurrent.futures import ThreadPoolExecutor
 import sys
 import os
 
@@ -7,8 +9,9 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from tokensmith.manager import DatasetManager
 
-# Parse command line arguments
-def parse_args():
+logger = logging.getLogger(__name__)
+
+def _build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="TokenSmith Streamlit UI")
     
     # Search arguments
@@ -37,7 +40,65 @@ def parse_args():
     parser.add_argument("--mode", type=str, choices=["search", "inspect", "both"], default="both", 
                        help="UI mode: 'search' for search only, 'inspect' for inspect and view documents, 'both' for all features")
     
-    return parser.parse_args()
+    return parser
+
+# Streamlit re-executes this script on every rerun and resets module globals, so the parsed arguments are kept
+# in a resource cache keyed on the command line instead. New sessions then reuse them without rebuilding the parser.
+@st.cache_resource(show_spinner=False)
+def _parse_cli_args(argv: tuple) -> argparse.Namespace:
+    return _build_parser().parse_args(list(argv))
+
+# Parse command line arguments
+def parse_args():
+    return _parse_cli_args(tuple(sys.argv[1:]))
+
+def _load_tokenizer(tokenizer_path: str):
+    from transformers import AutoTokenizer
+    logger.debug("Loading tokenizer from %s", tokenizer_path)
+    # Fast (Rust) tokenizers detokenize batches far faster; some models only ship a slow one, which still works
+    tokenizer = AutoTokenizer.from_pretrained(tokenizer_path, use_fast=True)
+    if not getattr(tokenizer, "is_fast", False):
+        logger.warning("No fast tokenizer is available for %s, detokenization will be slow. "
+                       "Installing `tokenizers` may provide one.", tokenizer_path)
+    return tokenizer
+
+# The tokenizer and the search index are read-only, so one instance of each is shared by all sessions
+# (browser tabs) of the process instead of being loaded again per session.
+@st.cache_resource(show_spinner=False)
+def _tokenizer_future(tokenizer_path: str):
+    """Starts loading the tokenizer on a background thread so the first page renders without waiting for it."""
+    loader = ThreadPoolExecutor(max_workers=1)
+    future = loader.submit(_load_tokenizer, tokenizer_path)
+    loader.shutdown(wait=False)
+    return future
+
+def _start_tokenizer_load(tokenizer_path: str):
+    st.session_state.tokenizer_future = _tokenizer_future(tokenizer_path)
+
+@st.cache_resource(show_spinner=False)
+def _shared_search_handler(bin_file_path: str, search_index_path: str, vocab: int, verbose: bool, reuse: bool):
+    manager = DatasetManager()
+    manager.setup_search(
+        bin_file_path=bin_file_path,
+        search_index_save_path=search_index_path,
+        vocab=vocab,
+        verbose=verbose,
+        reuse=reuse
+    )
+    return manager.search
+
+def _collect_tokenizer():
+    """Moves a finished background tokenizer load into the session state. Until then the tokenizer stays None."""
+    future = st.session_state.get("tokenizer_future")
+    if future is None or not future.done():
+        return
+    st.session_state.tokenizer_future = None
+    try:
+        st.session_state.tokenizer = future.result()
+    except Exception as e:
+        # Drop the failed load so that a new session tries again
+        _tokenizer_future.clear()
+        st.error(f"Failed to load tokenizer: {e}")
 
 # Initialize session state with DatasetManager
 def init_session_state():
@@ -56,14 +117,11 @@ def init_session_state():
             
     if "tokenizer" not in st.session_state:
         st.session_state.tokenizer = None
+        st.session_state.tokenizer_future = None
         # Try to load tokenizer if path provided
         if hasattr(st.session_state.args, 'tokenizer_path') and st.session_state.args.tokenizer_path:
-            try:
-                from transformers import AutoTokenizer
-                print(f"Loading tokenizer from {st.session_state.args.tokenizer_path}")
-                st.session_state.tokenizer = AutoTokenizer.from_pretrained(st.session_state.args.tokenizer_path)
-            except Exception as e:
-                st.error(f"Failed to load tokenizer: {e}")
+            _start_tokenizer_load(st.session_state.args.tokenizer_path)
+    _collect_tokenizer()
     
     # Initialize handlers based on mode
     mode = getattr(st.session_state.args, 'mode', 'both')
@@ -79,13 +137,13 @@ def init_session_state():
                 if not st.session_state.search_setup_done:
                     st.session_state.search_setup_done = True
                     # Initialize search handler
-                    print("Reuse Index:", getattr(st.session_state.args, 'reuse_index', False))
-                    st.session_state.dataset_manager.setup_search(
-                        bin_file_path=st.session_state.args.bin_file_path,
-                        search_index_save_path=st.session_state.args.search_index_path,
-                        vocab=st.session_state.args.vocab,
-                        verbose=getattr(st.session_state.args, 'search_verbose', False),
-                        reuse=getattr(st.session_state.args, 'reuse_index', False)
+                    logger.debug("Reuse index: %s", getattr(st.session_state.args, 'reuse_index', False))
+                    st.session_state.dataset_manager.search = _shared_search_handler(
+                        st.session_state.args.bin_file_path,
+                        st.session_state.args.search_index_path,
+                        st.session_state.args.vocab,
+                        getattr(st.session_state.args, 'search_verbose', False),
+                        getattr(st.session_state.args, 'reuse_index', False)
                     )
                 else:
                     # Already set up, no need to reinitialize
@@ -123,20 +181,32 @@ def init_session_state():
 init_session_state()
 
 # Create pages based on available functionality
-pages = []
-mode = getattr(st.session_state.args, 'mode', 'both')
+def _build_pages(mode: str, inspect_ready: bool, search_ready: bool) -> list:
+    pages = []
 
-if mode in ["inspect", "both"] and st.session_state.dataset_manager.inspect is not None:
-    inspect_page = st.Page("pages/inspect.py", title="Inspect Dataset", icon=":material/eye_tracking:")
-    pages.append(inspect_page)
-    
-    # Add view documents page when inspect is available
-    view_documents_page = st.Page("pages/view_documents.py", title="View Documents", icon=":material/description:")
-    pages.append(view_documents_page)
+    if mode in ["inspect", "both"] and inspect_ready:
+        inspect_page = st.Page("pages/inspect.py", title="Inspect Dataset", icon=":material/eye_tracking:")
+        pages.append(inspect_page)
+        
+        # Add view documents page when inspect is available
+        view_documents_page = st.Page("pages/view_documents.py", title="View Documents", icon=":material/description:")
+        pages.append(view_documents_page)
+
+    if mode in ["search", "both"] and search_ready:
+        search_page = st.Page("pages/search.py", title="Search Dataset", icon=":material/find_in_page:")
+        pages.append(search_page)
+
+    return pages
+
+mode = getattr(st.session_state.args, 'mode', 'both')
 
-if mode in ["search", "both"] and st.session_state.dataset_manager.search is not None:
-    search_page = st.Page("pages/search.py", title="Search Dataset", icon=":material/find_in_page:")
-    pages.append(search_page)
+# The available pages only change when a handler becomes ready, so the page list is built once per
+# session and state instead of on every rerun. st.navigation itself must still be called on every run.
+pages_key = (mode, st.session_state.dataset_manager.inspect is not None, st.session_state.dataset_manager.search is not None)
+if st.session_state.get("pages_key") != pages_key:
+    st.session_state.pages = _build_pages(*pages_key)
+    st.session_state.pages_key = pages_key
+pages = st.session_state.pages
 
 # If no pages are available, show an error
 if not pages:
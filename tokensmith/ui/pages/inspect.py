@@ -1,7 +1,41 @@
 import streamlit as st
-import json
 import numpy as np
 
+# Streamlit re-executes this script on every widget change. Cache fetched sequences and batches so that
+# fetching the same one again does not re-read and re-detokenize it. The leading underscores keep the
+# handler and the tokenizer out of the cache key.
+@st.cache_data(max_entries=256, show_spinner=False)
+def _fetch_sequence(_inspect_handler, sequence_id: int, return_doc_details: bool, return_detokenized: bool, _tokenizer):
+    return _inspect_handler.inspect_sample_by_id(
+        sample_id=sequence_id,
+        return_doc_details=return_doc_details,
+        return_detokenized=return_detokenized,
+        tokenizer=_tokenizer
+    )
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def _fetch_batch(_inspect_handler, batch_id: int, batch_size: int, return_doc_details: bool, return_detokenized: bool, _tokenizer):
+    return _inspect_handler.inspect_sample_by_batch(
+        batch_id=batch_id,
+        batch_size=batch_size,
+        return_doc_details=return_doc_details,
+        return_detokenized=return_detokenized,
+        tokenizer=_tokenizer
+    )
+
+def _show_token_arrays(token_arrays):
+    """Renders the token arrays of one sample as a single table, with the index of the array each token belongs to.
+    The arrays are sent to the browser as typed columns instead of being formatted into one string per array."""
+    token_arrays = [np.asarray(arr) for arr in token_arrays]
+    lengths = [arr.size for arr in token_arrays]
+    st.dataframe(
+        {
+            "Array": np.repeat(np.arange(len(token_arrays), dtype=np.uint32), lengths),
+            "Token": np.concatenate(token_arrays) if token_arrays else np.empty(0, dtype=np.int64),
+        },
+        use_container_width=True,
+    )
+
 st.title("Inspect Dataset")
 
 # Check if inspect handler is initialized
@@ -30,23 +64,35 @@ selected_function = st.sidebar.radio("Choose an operation:", function_names)
 
 # Options for detokenization and document details
 return_doc_details = st.sidebar.checkbox("Include document details", value=False)
-return_detokenized = st.sidebar.checkbox("Return detokenized text", value=False)
+tokenizer_loading = st.session_state.get("tokenizer_future") is not None
+return_detokenized = st.sidebar.checkbox(
+    "Return detokenized text",
+    value=False,
+    disabled=tokenizer_loading,
+    help="The tokenizer is still loading." if tokenizer_loading else None
+)
 
 if return_detokenized and not st.session_state.tokenizer:
     st.sidebar.warning("Tokenizer not available. Please provide tokenizer path in CLI args or disable detokenization.")
     return_detokenized = False
 
-if selected_function == "get_sequence":
+# Fragments rerun on their own when their widgets change, so entering an id or fetching does not rerun
+# the whole page. Older Streamlit versions without st.fragment run them as plain functions.
+_fragment = getattr(st, "fragment", lambda fn: fn)
+
+@_fragment
+def _sequence_view(return_doc_details: bool, return_detokenized: bool):
     sequence_id = st.number_input("Enter sequence ID:", min_value=0, value=0, step=1)
     
     if st.button("Get Sequence"):
         try:
             with st.spinner("Fetching sequence..."):
-                result = st.session_state.dataset_manager.inspect.inspect_sample_by_id(
-                    sample_id=sequence_id,
-                    return_doc_details=return_doc_details,
-                    return_detokenized=return_detokenized,
-                    tokenizer=st.session_state.tokenizer if return_detokenized else None
+                result = _fetch_sequence(
+                    st.session_state.dataset_manager.inspect,
+                    int(sequence_id),
+                    return_doc_details,
+                    return_detokenized,
+                    st.session_state.tokenizer if return_detokenized else None
                 )
                 
                 if return_doc_details:
@@ -58,8 +104,7 @@ if selected_function == "get_sequence":
                     else:
                         # Display tokens as arrays
                         st.write("Token Arrays:")
-                        for i, arr in enumerate(sequence_data):
-                            st.write(f"Array {i}: {arr.tolist()}")
+                        _show_token_arrays(sequence_data)
                     
                     st.subheader("Document Details")
                     st.json(doc_details)
@@ -71,26 +116,27 @@ if selected_function == "get_sequence":
                     else:
                         # Display tokens as arrays
                         st.write("Token Arrays:")
-                        for i, arr in enumerate(result):
-                            st.write(f"Array {i}: {arr.tolist()}")
+                        _show_token_arrays(result)
                             
         except Exception as e:
             st.error(f"Error fetching sequence: {e}")
             st.exception(e)
 
-elif selected_function == "get_batch":
+@_fragment
+def _batch_view(return_doc_details: bool, return_detokenized: bool):
     batch_id = st.number_input("Enter batch ID:", min_value=0, value=0, step=1)
     batch_size = st.number_input("Enter batch size:", value=16, min_value=1, step=1)
     
     if st.button("Get Batch"):
         try:
             with st.spinner("Fetching batch..."):
-                result = st.session_state.dataset_manager.inspect.inspect_sample_by_batch(
-                    batch_id=batch_id,
-                    batch_size=batch_size,
-                    return_doc_details=return_doc_details,
-                    return_detokenized=return_detokenized,
-                    tokenizer=st.session_state.tokenizer if return_detokenized else None
+                result = _fetch_batch(
+                    st.session_state.dataset_manager.inspect,
+                    int(batch_id),
+                    int(batch_size),
+                    return_doc_details,
+                    return_detokenized,
+                    st.session_state.tokenizer if return_detokenized else None
                 )
                 
                 st.subheader(f"Batch {batch_id} (Size: {batch_size})")
@@ -106,8 +152,7 @@ elif selected_function == "get_batch":
                                     st.text_area(f"Detokenized Text {i+1}:", value=sample_data, height=100, key=f"sample_{i}", disabled=True)
                                 else:
                                     # Display tokens as arrays
-                                    for j, arr in enumerate(sample_data):
-                                        st.write(f"Array {j}: {arr.tolist()}")
+                                    _show_token_arrays(sample_data)
                                 
                                 st.write("**Document Details:**")
                                 st.json(doc_details)
@@ -118,9 +163,13 @@ elif selected_function == "get_batch":
                                 st.text_area(f"Detokenized Text {i+1}:", value=sample_result, height=100, key=f"sample_{i}", disabled=True)
                             else:
                                 # Display tokens as arrays
-                                for j, arr in enumerate(sample_result):
-                                    st.write(f"Array {j}: {arr.tolist()}")
+                                _show_token_arrays(sample_result)
                                     
         except Exception as e:
             st.error(f"Error fetching batch: {e}")
             st.exception(e)
+
+if selected_function == "get_sequence":
+    _sequence_view(return_doc_details, return_detokenized)
+elif selected_function == "get_batch":
+    _batch_view(return_doc_details, return_detokenized)
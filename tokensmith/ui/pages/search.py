@@ -1,9 +1,165 @@
 import streamlit as st
 import numpy as np
-import pandas as pd
-import altair as alt
-import time
 import json
+from tokensmith.search.handler import _is_integer_array
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _parse_token_ids(text: str) -> list:
+    """Parses a JSON array of token ids, with orjson when available. Raises json.JSONDecodeError on invalid JSON
+    (orjson's error subclasses it) and ValueError if the result is not a list of integers."""
+    query = orjson.loads(text) if orjson is not None else json.loads(text)
+    # Shares the search handler's check, which rejects nested lists; bools count as integers as before
+    if not isinstance(query, list) or (query and not _is_integer_array(query)):
+        raise ValueError("Query must be a list of integers")
+    return query
+
+# Positions results can hold millions of offsets; only this many rows are rendered as a table
+_MAX_POSITION_ROWS = 10_000
+
+def _top_k(values: np.ndarray, k: int):
+    """Indices and values of the k largest entries, largest first.
+    Partitions the whole array once, then sorts only the k winners: O(V + k log k) instead of O(V log V)."""
+    top_idx = np.argpartition(values, -k)[-k:]
+    top_idx = top_idx[np.argsort(-values[top_idx], kind="stable")]
+    return top_idx, values[top_idx]
+
+# Streamlit re-executes this script on every widget change. Cache the results per query so reruns
+# don't hit the index again. The leading underscore keeps the handler out of the cache key.
+# These caches are shared by every session of the process, so each one keeps a bounded number of entries;
+# positions results in particular can hold millions of offsets.
+@st.cache_data(max_entries=32, show_spinner=False)
+def _search(_search_handler, function_name: str, query: tuple):
+    """Result of a count, contains or positions search, cached across reruns. Positions come back as an int64 array."""
+    if function_name == "positions":
+        return _search_handler.positions_np(list(query))
+    return getattr(_search_handler, function_name)(list(query))
+
+# Only the small top-k result is cached here. The full next-token counts are already cached by the
+# search handler, so moving the top-k slider or toggling normalization doesn't search the index again.
+@st.cache_data(max_entries=64, show_spinner=False)
+def _count_next_top_k(_search_handler, query: tuple, k: int, normalize: bool):
+    counts = np.asarray(_search_handler.count_next(list(query)))
+    num_nonzero = np.count_nonzero(counts)
+    if not num_nonzero:
+        return counts[:0], counts[:0]
+
+    top_tokens, top_values = _top_k(counts, min(k, num_nonzero))
+
+    # Compact fixed-width columns keep the Arrow payload sent to the browser small
+    top_tokens = top_tokens.astype(np.uint32)
+    if normalize:
+        # Only the k selected counts are scaled; one multiply by the reciprocal also does the float32 cast
+        return top_tokens, np.multiply(top_values, 1.0 / counts.sum(), dtype=np.float32)
+    return top_tokens, top_values
+
+# The tokenizer is shared by the whole process, so it is left out of these cache keys as well
+@st.cache_data(max_entries=128, show_spinner=False)
+def _encode(_tokenizer, text: str) -> list:
+    tokenized = _tokenizer.encode(text)
+    if isinstance(tokenized, list):
+        return tokenized
+    # Handle different tokenizer output formats
+    return tokenized.tolist() if hasattr(tokenized, 'tolist') else list(tokenized)
+
+@st.cache_data(max_entries=128, show_spinner=False)
+def _decode(_tokenizer, token_ids: tuple) -> str:
+    return _tokenizer.decode(list(token_ids))
+
+@st.cache_data(max_entries=128, show_spinner=False)
+def _decode_tokens(_tokenizer, token_ids: tuple) -> list:
+    """Detokenizes each token id on its own, with one batch_decode call when the tokenizer has it.
+    Tokens that cannot be decoded are shown as <UNK:id>."""
+    if hasattr(_tokenizer, "batch_decode"):
+        try:
+            return list(_tokenizer.batch_decode([[token_id] for token_id in token_ids]))
+        except Exception:
+            # Fall back to per-token decoding to find the tokens that fail
+            pass
+    decoded = []
+    for token_id in token_ids:
+        try:
+            decoded.append(_tokenizer.decode([token_id]))
+        except Exception:
+            decoded.append(f"<UNK:{token_id}>")
+    return decoded
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def _count_next_chart_spec(tokens: tuple, values: tuple, labels, normalize: bool) -> dict:
+    """Vega-Lite spec of the count_next bar chart, labelled with the detokenized text when labels are given.
+    The spec is written out directly, so the k rows are serialized once as inline values without going through pandas and Altair."""
+    value_field = "Probability" if normalize else "Count"
+    sort = {"field": value_field, "order": "descending"}
+    if labels is not None:
+        # Use detokenized text for x-axis labels
+        rows = [{"Token": token, "Detokenized": label, value_field: value} for token, label, value in zip(tokens, labels, values)]
+        x = {"field": "Detokenized", "type": "ordinal", "title": "Token Text", "sort": sort}
+        tooltip = [{"field": "Token", "type": "quantitative"}, {"field": "Detokenized", "type": "nominal"}]
+    else:
+        # Fallback to token IDs if no detokenized text available
+        rows = [{"Token": token, value_field: value} for token, value in zip(tokens, values)]
+        x = {"field": "Token", "type": "ordinal", "title": "Token ID", "sort": sort}
+        tooltip = [{"field": "Token", "type": "quantitative"}]
+    return {
+        "data": {"values": rows},
+        "mark": {"type": "bar"},
+        "encoding": {
+            "x": x,
+            "y": {"field": value_field, "type": "quantitative", "title": value_field},
+            "tooltip": tooltip + [{"field": value_field, "type": "quantitative"}],
+        },
+        "width": 700,
+        "height": 400,
+    }
+
+# Fragments rerun on their own when their widgets change. Older Streamlit versions without st.fragment
+# run them as plain functions.
+_fragment = getattr(st, "fragment", lambda fn: fn)
+
+@_fragment
+def _render_count_next(search_handler, query: list):
+    """Renders the count_next results. The top-k and normalization controls live in this fragment,
+    so changing them only re-renders the table and chart instead of rerunning the whole page."""
+    col_top_k, col_normalize = st.columns(2)
+    with col_top_k:
+        show_top_k = st.slider("Show top k results:", 1, 100, 10)
+    with col_normalize:
+        normalize = st.checkbox("Normalize distribution", value=False)
+
+    try:
+        top_tokens, top_values = _count_next_top_k(search_handler, tuple(query), show_top_k, normalize)
+        if len(top_tokens):
+            # Keep the pyarrow import local to the branch that renders the table
+            import pyarrow as pa
+
+            value_field = "Probability" if normalize else "Count"
+            columns = {"Token": pa.array(top_tokens), value_field: pa.array(top_values)}
+
+            # Add detokenized column if tokenizer is available
+            labels = None
+            if st.session_state.tokenizer:
+                try:
+                    labels = tuple(_decode_tokens(st.session_state.tokenizer, tuple(top_tokens.tolist())))
+                    columns["Detokenized"] = pa.array(labels, type=pa.string())
+                except Exception as e:
+                    st.write(f"Note: Could not detokenize tokens: {e}")
+
+            # An Arrow table is sent to the browser as is, without a pandas conversion in between
+            st.dataframe(pa.table(columns), use_container_width=True)
+
+            # The chart spec is cached, so reruns that do not change the results skip rebuilding it
+            st.vega_lite_chart(
+                _count_next_chart_spec(tuple(top_tokens.tolist()), tuple(top_values.tolist()), labels, normalize),
+                use_container_width=True
+            )
+        else:
+            st.write("No results found.")
+    except Exception as e:
+        st.error(f"Error executing count_next: {e}")
+        st.exception(e)
 
 # List of function names to choose from
 function_names = [
@@ -16,11 +172,6 @@ function_names = [
 st.sidebar.title("Select Function")
 selected_function = st.sidebar.radio("Choose an operation:", function_names)
 
-# Function-specific parameters
-if selected_function == "count_next":
-    show_top_k = st.sidebar.slider("Show top k results:", 1, 100, 10)
-    normalize = st.sidebar.checkbox("Normalize distribution", value=False)
-
 st.title("Search Dataset")
 
 # Check if search handler is initialized
@@ -58,16 +209,21 @@ if selected_function != st.session_state.last_function or input_type != st.sessi
     st.session_state.last_input_type = input_type
 
 if input_type == "Text (string)":
-    # Text input that will be tokenized
-    query_input = st.text_input(
-        "Enter your query as text:",
-        value=st.session_state.get("query", ""),
-        key="query",
-        help="Example: Hello world"
-    )
+    # Text input that will be tokenized. Inside a form, edits only take effect (and rerun the page) once submitted.
+    with st.form("search_form"):
+        query_input = st.text_input(
+            "Enter your query as text:",
+            value=st.session_state.get("query", ""),
+            key="query",
+            help="Example: Hello world"
+        )
+        st.form_submit_button("Run search")
     
     query = []
     if query_input:
+        if not st.session_state.tokenizer and st.session_state.get("tokenizer_future") is not None:
+            st.info("The tokenizer is still loading. Please try again in a moment.")
+            st.stop()
         if not st.session_state.tokenizer:
             st.error("❌ Tokenizer not available. Please provide --tokenizer-path in CLI arguments to use text input.")
             st.write("Alternative: Use 'Token IDs (JSON array)' input type above.")
@@ -75,12 +231,7 @@ if input_type == "Text (string)":
         
         try:
             # Tokenize the input text (preserve original whitespace)
-            tokenized = st.session_state.tokenizer.encode(query_input)
-            if isinstance(tokenized, list):
-                query = tokenized
-            else:
-                # Handle different tokenizer output formats
-                query = tokenized.tolist() if hasattr(tokenized, 'tolist') else list(tokenized)
+            query = _encode(st.session_state.tokenizer, query_input)
             
             # Show the tokenized version to user
             st.write(f"**Tokenized query:** {query}")
@@ -91,23 +242,25 @@ if input_type == "Text (string)":
             
 else:
     # Original token ID input
-    query_input = st.text_input(
-        "Enter your query (as JSON array of token IDs):",
-        value=st.session_state.get("query", ""),
-        key="query",
-        help="Example: [101, 2023, 102]"
-    )
+    with st.form("search_form"):
+        query_input = st.text_input(
+            "Enter your query (as JSON array of token IDs):",
+            value=st.session_state.get("query", ""),
+            key="query",
+            help="Example: [101, 2023, 102]"
+        )
+        st.form_submit_button("Run search")
     
     query = []
     if query_input.strip():
         try:
-            query = json.loads(query_input.strip())
-            if not isinstance(query, list) or not all(isinstance(x, int) for x in query):
-                st.error("Query must be a list of integers")
-                st.stop()
+            query = _parse_token_ids(query_input.strip())
         except json.JSONDecodeError as e:
             st.error(f"Invalid JSON format: {e}")
             st.stop()
+        except ValueError as e:
+            st.error(str(e))
+            st.stop()
 
 # Execute the selected function
 if query:
@@ -127,14 +280,14 @@ if query:
                     st.write(f"**Original text:** `{query_input}`")
                     # Show detokenized version for verification
                     try:
-                        detokenized = st.session_state.tokenizer.decode(query)
+                        detokenized = _decode(st.session_state.tokenizer, tuple(query))
                         st.write(f"**Detokenized:** `{detokenized}`")
                     except Exception as e:
                         st.write(f"**Detokenization error:** {e}")
                 elif st.session_state.tokenizer and input_type == "Token IDs (JSON array)":
                     # Show detokenized version of token IDs
                     try:
-                        detokenized = st.session_state.tokenizer.decode(query)
+                        detokenized = _decode(st.session_state.tokenizer, tuple(query))
                         st.write(f"**Detokenized text:** {detokenized}")
                     except Exception as e:
                         st.write(f"**Detokenization error:** {e}")
@@ -142,78 +295,31 @@ if query:
             st.subheader("Results")
             
             if selected_function == "count":
-                result = search_handler.count(query)
+                result = _search(search_handler, "count", tuple(query))
                 st.metric("Total count of tokens", result)
                 
             elif selected_function == "contains":
-                result = search_handler.contains(query)
+                result = _search(search_handler, "contains", tuple(query))
                 st.write(f"Contains tokens: {result}")
                 
             elif selected_function == "positions":
-                result = search_handler.positions(query)
-                st.write(f"Positions of tokens: {result}")
-                if result:
-                    df = pd.DataFrame({"Position": result})
-                    st.dataframe(df)
+                result = _search(search_handler, "positions", tuple(query))
+                st.write(f"**Number of positions:** `{result.size}`")
+                if result.size:
+                    # Only the first rows go to the browser; the full result is offered as a raw int64 download
+                    if result.size > _MAX_POSITION_ROWS:
+                        st.caption(f"Showing the first {_MAX_POSITION_ROWS:,} of {result.size:,} positions.")
+                    st.dataframe(result[:_MAX_POSITION_ROWS], use_container_width=True)
+                    st.download_button(
+                        label="Download Positions (int64)",
+                        data=result.astype("<i8", copy=False).tobytes(),
+                        file_name="positions_int64.bin",
+                        mime="application/octet-stream",
+                        help="Raw little-endian int64 values; load them with numpy.fromfile(path, dtype='<i8')"
+                    )
                     
             elif selected_function == "count_next":
-                result = search_handler.count_next(query)
-                if result:
-                    # Convert to DataFrame for display
-                    counts_dict = {i: count for i, count in enumerate(result) if count > 0}
-                    if counts_dict:
-                        sorted_items = sorted(counts_dict.items(), key=lambda x: x[1], reverse=True)
-                        top_k_items = sorted_items[:show_top_k]
-                        
-                        if normalize:
-                            total = sum(counts_dict.values())
-                            top_k_items = [(token, count/total) for token, count in top_k_items]
-                        
-                        df = pd.DataFrame(top_k_items, columns=["Token", "Probability" if normalize else "Count"])
-                        
-                        # Add detokenized column if tokenizer is available
-                        if st.session_state.tokenizer:
-                            try:
-                                detokenized_tokens = []
-                                for token_id, _ in top_k_items:
-                                    try:
-                                        detokenized = st.session_state.tokenizer.decode([token_id])
-                                        detokenized_tokens.append(detokenized)
-                                    except:
-                                        detokenized_tokens.append(f"<UNK:{token_id}>")
-                                df["Detokenized"] = detokenized_tokens
-                            except Exception as e:
-                                st.write(f"Note: Could not detokenize tokens: {e}")
-                        
-                        st.dataframe(df)
-                        
-                        # Create visualization
-                        if st.session_state.tokenizer and "Detokenized" in df.columns:
-                            # Use detokenized text for x-axis labels
-                            chart = alt.Chart(df).mark_bar().encode(
-                                x=alt.X("Detokenized:O", 
-                                       title="Token Text", 
-                                       sort=alt.EncodingSortField(field="Probability" if normalize else "Count", order="descending")),
-                                y=alt.Y("Probability:Q" if normalize else "Count:Q", 
-                                       title="Probability" if normalize else "Count"),
-                                tooltip=["Token", "Detokenized", "Probability" if normalize else "Count"]
-                            ).properties(width=700, height=400)
-                        else:
-                            # Fallback to token IDs if no detokenized text available
-                            chart = alt.Chart(df).mark_bar().encode(
-                                x=alt.X("Token:O", 
-                                       title="Token ID", 
-                                       sort=alt.EncodingSortField(field="Probability" if normalize else "Count", order="descending")),
-                                y=alt.Y("Probability:Q" if normalize else "Count:Q", 
-                                       title="Probability" if normalize else "Count"),
-                                tooltip=["Token", "Probability" if normalize else "Count"]
-                            ).properties(width=700, height=400)
-                        
-                        st.altair_chart(chart, use_container_width=True)
-                    else:
-                        st.write("No results found.")
-                else:
-                    st.write("No results found.")
+                _render_count_next(search_handler, query)
                     
     except Exception as e:
         st.error(f"Error executing {selected_function}: {e}")
@@ -2,6 +2,43 @@ import streamlit as st
 import json
 import numpy as np
 
+# Streamlit re-executes this script on every widget change. The JSON export of a fetched document is built
+# once per fetch instead of on every rerun. A fetch is identified by document id, mode and fetch timestamp,
+# and the leading underscore keeps the token array itself out of the cache key.
+@st.cache_data(max_entries=8, show_spinner=False)
+def _tokens_json(document_id: int, mode: str, timestamp: str, _document_data: np.ndarray) -> str:
+    document_json = json.dumps({
+        'document_id': document_id,
+        'mode': mode,
+        'tokens': [],
+        'metadata': {
+            'token_count': len(_document_data),
+            'dtype': str(_document_data.dtype),
+            'timestamp': timestamp
+        }
+    }, indent=2)
+    if not len(_document_data):
+        return document_json
+    # json.dumps with indent falls back to the pure-Python encoder, which is slow for millions of tokens.
+    # Lay out the token list the same way with one join instead. The first "tokens" key is always ours,
+    # since the id and mode before it cannot contain it.
+    tokens_json = "[\n    " + ",\n    ".join(map(str, _document_data.tolist())) + "\n  ]"
+    return document_json.replace('"tokens": []', '"tokens": ' + tokens_json, 1)
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def _detokenize_document(_tokenizer, document_id: int, mode: str, timestamp: str, _document_data: np.ndarray):
+    """Detokenizes a fetched document once per fetch and returns the text with its word and line counts."""
+    text = _tokenizer.decode(_document_data)
+    # str.split() is the fastest word count in CPython, lines only need a count
+    return text, len(text.split()), text.count('\n') + 1
+
+@st.cache_data(max_entries=128, show_spinner=False)
+def _fetch_document(_dataset, mode: str, document_id: int) -> np.ndarray:
+    """Fetches a document in corpus or training order, cached so that viewing it again skips the read."""
+    if mode == "Corpus Order":
+        return _dataset.get_corpus_document_by_id(document_id)
+    return _dataset.get_train_document_by_id(document_id)
+
 st.title("View Documents")
 
 # Check if inspect handler is initialized
@@ -39,10 +76,12 @@ document_id = st.sidebar.number_input(
 )
 
 # Detokenization options
+tokenizer_loading = st.session_state.get("tokenizer_future") is not None
 return_detokenized = st.sidebar.checkbox(
     "Return detokenized text", 
     value=False,
-    help="Convert tokens back to readable text"
+    disabled=tokenizer_loading,
+    help="The tokenizer is still loading." if tokenizer_loading else "Convert tokens back to readable text"
 )
 
 if return_detokenized and not st.session_state.tokenizer:
@@ -66,11 +105,12 @@ with col1:
         try:
             with st.spinner("Fetching document..."):
                 # Get the document using the appropriate method
+                document_data = _fetch_document(
+                    st.session_state.dataset_manager.WriteableMMapIndexedDataset, document_mode, int(document_id)
+                )
                 if document_mode == "Corpus Order":
-                    document_data = st.session_state.dataset_manager.WriteableMMapIndexedDataset.get_corpus_document_by_id(document_id)
                     st.success(f"✅ Successfully retrieved document {document_id} in corpus order")
                 else:  # Training Order
-                    document_data = st.session_state.dataset_manager.WriteableMMapIndexedDataset.get_train_document_by_id(document_id)
                     st.success(f"✅ Successfully retrieved document {document_id} in training order")
                 
                 # Store results in session state for persistence
@@ -113,7 +153,7 @@ if hasattr(st.session_state, 'current_document') and st.session_state.current_do
     if show_raw_tokens:
         st.subheader("Raw Tokens")
         with st.expander("View Raw Token Array", expanded=False):
-            st.code(str(document_data.tolist()[:100]) + ("..." if len(document_data) > 100 else ""))
+            st.code(str(document_data[:100].tolist()) + ("..." if len(document_data) > 100 else ""))
             
             # Show first and last few tokens
             if len(document_data) > 20:
@@ -126,7 +166,9 @@ if hasattr(st.session_state, 'current_document') and st.session_state.current_do
     if return_detokenized:
         st.subheader("Detokenized Text")
         try:
-            detokenized_text = st.session_state.tokenizer.decode(document_data)
+            detokenized_text, word_count, line_count = _detokenize_document(
+                st.session_state.tokenizer, doc_info['id'], doc_info['mode'], doc_info['timestamp'], document_data
+            )
             
             # Display text with formatting
             st.text(
@@ -140,9 +182,9 @@ if hasattr(st.session_state, 'current_document') and st.session_state.current_do
             with col1:
                 st.metric("Character Count", len(detokenized_text))
             with col2:
-                st.metric("Word Count", len(detokenized_text.split()))
+                st.metric("Word Count", word_count)
             with col3:
-                st.metric("Line Count", len(detokenized_text.split('\n')))
+                st.metric("Line Count", line_count)
                 
         except Exception as e:
             st.error(f"❌ Error during detokenization: {str(e)}")
@@ -153,16 +195,7 @@ if hasattr(st.session_state, 'current_document') and st.session_state.current_do
     
     with col1:
         # Download raw tokens as JSON
-        tokens_json = json.dumps({
-            'document_id': doc_info['id'],
-            'mode': doc_info['mode'],
-            'tokens': document_data.tolist(),
-            'metadata': {
-                'token_count': len(document_data),
-                'dtype': str(document_data.dtype),
-                'timestamp': doc_info['timestamp']
-            }
-        }, indent=2)
+        tokens_json = _tokens_json(doc_info['id'], doc_info['mode'], doc_info['timestamp'], document_data)
         
         st.download_button(
             label="Download Tokens (JSON)",
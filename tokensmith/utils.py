@@ -5,33 +5,191 @@ import numpy as np
 import os
 from tqdm import trange
 import uuid
-from typing import Optional, List, Dict, Any
-from megatron.data.indexed_dataset import MMapIndexedDataset
+from typing import Optional, List, Dict, Any, Sequence, Union
 from .megatron_dependencies import get_train_valid_test_split_, build_index_mappings
-from transformers import AutoTokenizer
-import torch
 import os
 from functools import lru_cache
+from collections import OrderedDict
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 import time
 
+# GPT-NeoX's megatron package is only needed to open datasets; the rest of this module works without it
+try:
+    from megatron.data.indexed_dataset import MMapIndexedDataset
+except ImportError:
+    MMapIndexedDataset = None
+
+try:
+    from transformers import AutoTokenizer
+except ImportError:
+    AutoTokenizer = Any
+
 logger = logging.getLogger(__name__)
 
+# Batches with at least this many single-document examples are read with positional reads on a thread pool
+_PARALLEL_READ_THRESHOLD = 32
+_read_pool = None
+
+def _get_read_pool() -> ThreadPoolExecutor:
+    """Returns the shared thread pool for parallel corpus reads, creating it on first use."""
+    global _read_pool
+    if _read_pool is None:
+        _read_pool = ThreadPoolExecutor(max_workers=min(32, os.cpu_count() or 4))
+    return _read_pool
+
+def _reset_read_pool() -> None:
+    """Drops the shared read pool in a forked child (e.g. an export worker). The child inherits the pool
+    without its worker threads, so reads submitted to it would wait forever; a new one is created on first use."""
+    global _read_pool
+    _read_pool = None
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_read_pool)
+
 @lru_cache(1)
 def warn_once(logger: logging.Logger, msg: str):
     logger.warning(msg)
     time.sleep(10)
 
+def concat_segments(tokenized_segments: List[np.ndarray], out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Joins the per-document segments of a sample into a single array.
+    Most samples fall within a single document, in which case the segment is returned as-is
+    instead of being copied. The result may therefore be read-only.
+    If `out` is given, the segments are copied into it instead of a newly allocated array.
+    """
+    if out is None and len(tokenized_segments) == 1:
+        return tokenized_segments[0]
+    return np.concatenate(tokenized_segments, out=out)
+
 def generate_training_sample(tokenized_segments: List[List[int]], tokenizer: AutoTokenizer) -> str:
-    concat_training_sample = np.concatenate(tokenized_segments)
+    concat_training_sample = concat_segments(tokenized_segments)
     return tokenizer.decode(
         concat_training_sample,
     )
 
+# Samples of at most this many tokens go through the decode cache in generate_training_samples. Longer
+# samples are mostly unique, so caching them would only evict useful entries.
+_DECODE_CACHE_MAX_TOKENS = 256
+# Number of decoded texts kept per tokenizer
+_DECODE_CACHE_SIZE = 8192
+
+# One LRU cache of decoded text per tokenizer, keyed on (dtype, raw token bytes). The tokenizers are held
+# weakly, so a cache is dropped together with its tokenizer instead of pinning it for the life of the process.
+# The lock guards the caches, which are shared by every thread (e.g. concurrent UI sessions), not the decoding.
+_decode_caches = weakref.WeakKeyDictionary()
+_decode_cache_lock = threading.Lock()
+
+def _decode_cache(tokenizer: AutoTokenizer) -> Optional[OrderedDict]:
+    """Returns the decode cache of tokenizer, or None for tokenizers that cannot be weakly referenced or hashed."""
+    try:
+        with _decode_cache_lock:
+            cache = _decode_caches.get(tokenizer)
+            if cache is None:
+                cache = _decode_caches[tokenizer] = OrderedDict()
+            return cache
+    except TypeError:
+        return None
+
+def _cache_get(cache: OrderedDict, key: tuple) -> Optional[str]:
+    with _decode_cache_lock:
+        text = cache.get(key)
+        if text is not None:
+            cache.move_to_end(key)
+        return text
+
+def _cache_put(cache: OrderedDict, key: tuple, text: str) -> None:
+    with _decode_cache_lock:
+        cache[key] = text
+        cache.move_to_end(key)
+        if len(cache) > _DECODE_CACHE_SIZE:
+            cache.popitem(last=False)
+
+def _batch_decode(token_arrays: List[np.ndarray], tokenizer: AutoTokenizer) -> List[str]:
+    if hasattr(tokenizer, 'batch_decode'):
+        return tokenizer.batch_decode(token_arrays)
+    return [tokenizer.decode(tokens) for tokens in token_arrays]
+
+def generate_training_samples(samples: List[List[np.ndarray]], tokenizer: AutoTokenizer) -> List[str]:
+    """
+    Detokenizes several samples at once, using a single `tokenizer.batch_decode` call when available
+    and falling back to one `decode` call per sample otherwise.
+    Short samples are first looked up in the tokenizer's decode cache, so duplicates (common in shuffled or
+    repeated corpora) are only detokenized once; all cache misses are then decoded in that single batch.
+    """
+    concat_training_samples = [concat_segments(tokenized_segments) for tokenized_segments in samples]
+    cache = _decode_cache(tokenizer)
+
+    decoded = [None] * len(concat_training_samples)
+    keys = [None] * len(concat_training_samples)
+    misses = []
+    for i, tokens in enumerate(concat_training_samples):
+        if cache is not None and tokens.size <= _DECODE_CACHE_MAX_TOKENS:
+            keys[i] = (tokens.dtype.str, tokens.tobytes())
+            decoded[i] = _cache_get(cache, keys[i])
+            if decoded[i] is not None:
+                continue
+        misses.append(i)
+
+    if misses:
+        texts = _batch_decode([concat_training_samples[i] for i in misses], tokenizer)
+        for i, text in zip(misses, texts):
+            decoded[i] = text
+            if keys[i] is not None:
+                _cache_put(cache, keys[i], text)
+    return decoded
+
+def decode_cached(tokens: np.ndarray, tokenizer: AutoTokenizer) -> str:
+    """
+    Decodes a token array, memoizing the result in the tokenizer's decode cache under the raw token bytes.
+    Re-previewing the same sample (common when iterating in a notebook or the UI) then skips detokenization.
+    """
+    cache = _decode_cache(tokenizer)
+    if cache is None:
+        return tokenizer.decode(tokens)
+    key = (tokens.dtype.str, tokens.tobytes())
+    text = _cache_get(cache, key)
+    if text is None:
+        text = tokenizer.decode(tokens)
+        _cache_put(cache, key, text)
+    return text
+
+def _load_index(path: str) -> np.ndarray:
+    """
+    Memory-maps a saved index file read-only and hints the OS to start reading its data into the page cache,
+    so the first lookups into a cold index do not each block on a separate page fault.
+    The hint is asynchronous and does nothing on platforms without `os.posix_fadvise`.
+    """
+    index = np.load(path, allow_pickle=True, mmap_mode="r")
+    if hasattr(os, "posix_fadvise") and isinstance(index, np.memmap) and index.nbytes > 0:
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.posix_fadvise(fd, index.offset, index.nbytes, os.POSIX_FADV_WILLNEED)
+        finally:
+            os.close(fd)
+    return index
+
+def _index_pointers(index) -> np.ndarray:
+    """
+    Returns the byte offset of every document in a corpus index as an array.
+    GPT-NeoX's `MMapIndexedDataset.Index` keeps the offsets in the private `_pointers`, while other Megatron
+    versions expose them as `pointers`. Indexes with neither are read one document at a time through `__getitem__`.
+    """
+    pointers = getattr(index, "pointers", None)
+    if pointers is None:
+        pointers = getattr(index, "_pointers", None)
+    if pointers is None:
+        num_documents = len(index.sizes)
+        pointers = np.fromiter((index[i][0] for i in range(num_documents)), dtype=np.int64, count=num_documents)
+    return np.asarray(pointers)
+
 class BatchInfo:
     def __init__(self, batch_info_prefix: str):
-        self.doc_idx = np.load(f"{batch_info_prefix}_doc_idx.npy", allow_pickle=True, mmap_mode="r")
-        self.sample_idx = np.load(f"{batch_info_prefix}_sample_idx.npy", allow_pickle=True, mmap_mode="r")
-        self.shuffle_idx = np.load(f"{batch_info_prefix}_shuffle_idx.npy", allow_pickle=True, mmap_mode="r")
+        self.doc_idx = _load_index(f"{batch_info_prefix}_doc_idx.npy")
+        self.sample_idx = _load_index(f"{batch_info_prefix}_sample_idx.npy")
+        self.shuffle_idx = _load_index(f"{batch_info_prefix}_shuffle_idx.npy")
     
     def get_example_details_by_id(self, example_loc: int) -> dict:
         pt_shuffle_idx = self.shuffle_idx[example_loc]
@@ -63,12 +221,16 @@ class WriteableMMapIndexedDataset:
                  add_extra_token_to_seq: int):
         logger.debug(f"Initializing WriteableMMapIndexedDataset with pointer: {dataset_prefix}.bin and index: {dataset_prefix}.idx")
 
+        if MMapIndexedDataset is None:
+            raise ValueError("GPT-NeoX's megatron package must be installed to open a dataset")
+
         self.corpus_pointer = open(f"{dataset_prefix}.bin", 'r+b')
         self.corpus_index = MMapIndexedDataset.Index(f"{dataset_prefix}.idx")
         self.corpus_dtype = self.corpus_index.dtype
 
         self.num_samples = train_batch_size * train_iters
         self.num_documents = len(self.corpus_index.sizes)
+        self.corpus_pointers = _index_pointers(self.corpus_index)
         
         batch_info_save_path = f"{batch_info_save_prefix}_train_indexmap_{train_iters*train_batch_size}ns_{train_seq_len}sl_{seed}s_{packing_impl}pi"
         if allow_chopped:
@@ -88,6 +250,18 @@ class WriteableMMapIndexedDataset:
         self.train_seq_len = train_seq_len
         self.add_extra_token_to_seq = add_extra_token_to_seq  # Default to 1 to account adding EOS token
     
+    def prefetch(self, start_offset: int, length: int):
+        """
+        Hints the OS to start reading a byte range of the corpus into the page cache, so that later reads
+        of it do not block on disk. Does nothing on platforms without `os.posix_fadvise` (e.g. Windows, macOS).
+
+        Args:
+            start_offset (int): Byte offset of the range in the .bin file.
+            length (int): Length of the range in bytes.
+        """
+        if hasattr(os, "posix_fadvise") and length > 0:
+            os.posix_fadvise(self.corpus_pointer.fileno(), start_offset, length, os.POSIX_FADV_WILLNEED)
+
     def close(self):
         """
         Closes the corpus pointer to release the file handle.
@@ -179,11 +353,185 @@ class WriteableMMapIndexedDataset:
             - If the sequence spans multiple documents, the list contains one array per document segment.
             - The dtype used for reading is inferred from `corpus_index_.dtype`.
         """
+        doc_details = self.batch_info.get_example_details_by_id(example_loc)
+        output_seq = self._read_example(doc_details["doc_index_f"], doc_details["doc_index_l"],
+                                        doc_details["offset_f"], doc_details["offset_l"])
+        if return_doc_details:
+            return output_seq, doc_details
+        return output_seq
+
+    def get_examples_by_range(self, start: int, end: int, return_doc_details: bool = False) -> list:
+        """
+        Reads the examples at locations [start, end) of a training run.
+
+        The shuffle/sample index entries for the whole range are gathered with one slice instead of
+        per-example lookups, and the examples are read from the corpus in file order rather than in
+        shuffled order, so reads move forward through the file and benefit from OS readahead.
+
+        Args:
+            start (int): Location of the first example to read (inclusive).
+            end (int): Location of the last example to read (exclusive).
+            return_doc_details (bool): If True, returns the document details along with the data.
+
+        Raises:
+            IndexError: If the range extends past the end of the training run.
+
+        Returns:
+            list: One entry per location, in location order, in the same format as `get_example_by_id`.
+        """
+        if end > len(self.batch_info.shuffle_idx):
+            raise IndexError(f"end ({end}) exceeds the number of examples ({len(self.batch_info.shuffle_idx)})")
+        if start >= end:
+            return []
+
+        return self._read_examples(np.asarray(self.batch_info.shuffle_idx[start:end]), return_doc_details)
+
+    def get_examples_by_ids(self, example_locs: Union[np.ndarray, Sequence[int]], return_doc_details: bool = False) -> list:
+        """
+        Reads the examples at arbitrary locations of a training run.
+
+        Like `get_examples_by_range`, the index entries for all locations are gathered at once and the
+        examples are read from the corpus in file order.
+
+        Args:
+            example_locs (Union[np.ndarray, Sequence[int]]): Locations of the examples to read.
+            return_doc_details (bool): If True, returns the document details along with the data.
+
+        Raises:
+            IndexError: If any location is negative or past the end of the training run.
+
+        Returns:
+            list: One entry per location, in the given order, in the same format as `get_example_by_id`.
+        """
+        example_locs = np.asarray(example_locs, dtype=np.int64)
+        num_examples = len(self.batch_info.shuffle_idx)
+        if example_locs.size == 0:
+            return []
+        if example_locs.min() < 0 or example_locs.max() >= num_examples:
+            raise IndexError(f"example locations must be in [0, {num_examples})")
+
+        return self._read_examples(np.asarray(self.batch_info.shuffle_idx)[example_locs], return_doc_details)
+
+    def prefetch_examples(self, example_locs: Union[np.ndarray, Sequence[int]]):
+        """
+        Hints the OS to read the examples at the given locations of a training run into the page cache, so a
+        later read of them does not block on disk. Overlapping and adjacent byte ranges are merged into one hint.
+        Only the file descriptor is used, not the read position, so this can run on a background thread while
+        other examples are being read. Does nothing on platforms without `os.posix_fadvise`.
+
+        Args:
+            example_locs (Union[np.ndarray, Sequence[int]]): Locations of the examples to prefetch.
+        """
+        if not hasattr(os, "posix_fadvise"):
+            return
+        example_locs = np.asarray(example_locs, dtype=np.int64)
+        if example_locs.size == 0:
+            return
+
+        shuffle_idx = np.asarray(self.batch_info.shuffle_idx)[example_locs]
+        first = np.asarray(self.batch_info.sample_idx[shuffle_idx])
+        last = np.asarray(self.batch_info.sample_idx[shuffle_idx + 1])
+        starts_f, lengths_f, starts_l, lengths_l = self._segment_spans(first[:, 0], last[:, 0], first[:, 1], last[:, 1])
+        self._prefetch_spans(np.concatenate([starts_f, starts_l]), np.concatenate([lengths_f, lengths_l]))
+
+    def _segment_spans(self, doc_index_f: np.ndarray, doc_index_l: np.ndarray, offset_f: np.ndarray, offset_l: np.ndarray):
+        """
+        Returns the byte offsets and lengths of each example's first and last document segment as
+        (starts_f, lengths_f, starts_l, lengths_l). Single-document examples get a zero-length last segment.
+        """
+        itemsize = np.dtype(self.corpus_dtype).itemsize
+        first_docs_in_corpus = np.asarray(self.batch_info.doc_idx[doc_index_f])
+        last_docs_in_corpus = np.asarray(self.batch_info.doc_idx[doc_index_l])
+        single_doc = doc_index_f == doc_index_l
+        starts_f = self.corpus_pointers[first_docs_in_corpus] + offset_f * itemsize
+        lengths_f = np.where(single_doc,
+                             offset_l - offset_f + self.add_extra_token_to_seq,
+                             self.corpus_index.sizes[first_docs_in_corpus] - offset_f) * itemsize
+        starts_l = self.corpus_pointers[last_docs_in_corpus]
+        lengths_l = np.where(single_doc, 0, offset_l + self.add_extra_token_to_seq) * itemsize
+        return starts_f, lengths_f, starts_l, lengths_l
+
+    def _prefetch_spans(self, starts: np.ndarray, lengths: np.ndarray):
+        """Issues one prefetch hint per run of overlapping or adjacent byte ranges."""
+        if not hasattr(os, "posix_fadvise"):
+            return
+        keep = lengths > 0
+        starts, lengths = starts[keep], lengths[keep]
+        order = np.argsort(starts, kind="stable")
+        run_start, run_end = None, None
+        for start, end in zip(starts[order].tolist(), (starts + lengths)[order].tolist()):
+            if run_end is not None and start <= run_end:
+                run_end = max(run_end, end)
+                continue
+            if run_end is not None:
+                self.prefetch(run_start, run_end - run_start)
+            run_start, run_end = start, end
+        if run_end is not None:
+            self.prefetch(run_start, run_end - run_start)
+
+    def _read_examples(self, shuffle_idx: np.ndarray, return_doc_details: bool) -> list:
+        """Reads the examples at the given shuffled sample positions in corpus order, returning them in the given order."""
+        first = np.asarray(self.batch_info.sample_idx[shuffle_idx])
+        last = np.asarray(self.batch_info.sample_idx[shuffle_idx + 1])
+        doc_index_f, offset_f = first[:, 0], first[:, 1]
+        doc_index_l, offset_l = last[:, 0], last[:, 1]
+
+        # Order the reads by the byte offset of each example's first document
+        first_docs_in_corpus = np.asarray(self.batch_info.doc_idx[doc_index_f])
+        read_order = np.argsort(self.corpus_pointers[first_docs_in_corpus], kind="stable")
+
+        # Resolve the byte span of each example's first and last document segment for the whole batch at once
+        single_doc = doc_index_f == doc_index_l
+        starts_f, lengths_f, starts_l, lengths_l = self._segment_spans(doc_index_f, doc_index_l, offset_f, offset_l)
+
+        # Hint those spans up front so the disk reads overlap with the loop below instead of faulting in
+        # one example at a time. Middle documents of long examples are left to the regular reads.
+        self._prefetch_spans(np.concatenate([starts_f, starts_l]), np.concatenate([lengths_f, lengths_l]))
+
+        starts_f = starts_f.tolist()
+        lengths_f = lengths_f.tolist()
+        read_order = read_order.tolist()
+
+        examples = [None] * len(shuffle_idx)
+        single_doc = single_doc.tolist()
+
+        # Large batches read their single-document examples concurrently. os.pread does not use or move the
+        # shared file position and releases the GIL while blocked on disk, so the reads overlap.
+        raw_reads = {}
+        single_doc_reads = [i for i in read_order if single_doc[i]]
+        if hasattr(os, "pread") and len(single_doc_reads) >= _PARALLEL_READ_THRESHOLD:
+            # Positional reads bypass the file object's buffer, so pending injected bytes must reach the file first
+            self.corpus_pointer.flush()
+            fd = self.corpus_pointer.fileno()
+            raw_reads = dict(zip(single_doc_reads, _get_read_pool().map(
+                lambda i: os.pread(fd, lengths_f[i], starts_f[i]), single_doc_reads)))
+
+        for i in read_order:
+            if single_doc[i]:
+                # Most examples lie within one document, which is a single read at the resolved span
+                if i in raw_reads:
+                    raw = raw_reads[i]
+                else:
+                    self.corpus_pointer.seek(starts_f[i])
+                    raw = self.corpus_pointer.read(lengths_f[i])
+                output_seq = [np.frombuffer(raw, dtype=np.dtype(self.corpus_dtype))]
+            else:
+                output_seq = self._read_example(doc_index_f[i], doc_index_l[i], offset_f[i], offset_l[i])
+            if return_doc_details:
+                examples[i] = (output_seq, {
+                    "doc_index_f": doc_index_f[i],
+                    "doc_index_l": doc_index_l[i],
+                    "offset_f": offset_f[i],
+                    "offset_l": offset_l[i]
+                })
+            else:
+                examples[i] = output_seq
+        return examples
+
+    def _read_example(self, doc_index_f_: int, doc_index_l_: int, offset_f_: int, offset_l_: int) -> List[np.ndarray]:
+        """Reads the per-document segments of an example spanning documents doc_index_f_ to doc_index_l_ of the run."""
         output_seq = []
 
-        doc_details = self.batch_info.get_example_details_by_id(example_loc)
-        doc_index_f_, doc_index_l_ = doc_details["doc_index_f"], doc_details["doc_index_l"]
-        offset_f_, offset_l_ = doc_details["offset_f"], doc_details["offset_l"]
         if doc_index_f_ == doc_index_l_:
             pt_byte_offset, _ = self.corpus_index[self.batch_info.get_doc_index_in_corpus(doc_index_f_)]
             pt_byte_offset += offset_f_ * np.dtype(self.corpus_dtype).itemsize
@@ -211,8 +559,6 @@ class WriteableMMapIndexedDataset:
             self.corpus_pointer.seek(pt_byte_offset)
             output_seq.append(np.frombuffer(self.corpus_pointer.read(item_length),
                                             dtype=np.dtype(self.corpus_dtype)))
-        if return_doc_details:
-            return output_seq, doc_details
         return output_seq
 
     def write_example_into_corpus(self, injection_loc: int, injection_data: np.ndarray, dry_run: bool = False):
@@ -289,7 +635,9 @@ class WriteableMMapIndexedDataset:
         
     def inject_example_into_corpus(self, injection_loc: int, injection_data: np.ndarray,
                                    injection_type: str, rng: np.random.Generator, 
-                                   dry_run: bool = False):
+                                   dry_run: bool = False,
+                                   orig_example: Optional[List[np.ndarray]] = None,
+                                   return_example: bool = False):
         """
         Injects an example into the corpus at the specified location (sample number in a training run).
         
@@ -299,9 +647,21 @@ class WriteableMMapIndexedDataset:
             injection_type (str): The type of injection, e.g., "seq_start" or "seq_shuffle".
             rng (np.random.Generator): Random number generator for sampling positions.
             dry_run (bool): If True, only simulates the injection operation without actually modifying the corpus.
+            orig_example (list of np.ndarray, optional): The example at `injection_loc` as returned by `get_example_by_id`,
+                if the caller already has it. Saves reading it from the corpus again.
+            return_example (bool): If True, also returns the example as `get_example_by_id` would return it after the injection,
+                built from the data written instead of being read back from the corpus.
+
+        Returns:
+            injection_details (dict): Details about the injection and the corpus documents it was written into.
+            example (list of np.ndarray, optional): If `return_example` is True, the example after the injection
+                (unchanged if `dry_run` is True).
         """
         injection_details = {}
 
+        if orig_example is None and (injection_type == "seq_shuffle" or dry_run or return_example):
+            orig_example = self.get_example_by_id(injection_loc)
+
         # Cast injection_data to the corpus dtype
         if injection_data.dtype != self.corpus_dtype:
             logger.warning(f">> Casting injection data from {injection_data.dtype} to {self.corpus_dtype}")
@@ -315,8 +675,8 @@ class WriteableMMapIndexedDataset:
             Step 4: Shorten the sequence to the train_seq_len
             Step 5: Inject it into the tokenized corpus
             """
-            # Step 1: Read in the orig training sequence
-            pt_train_seqs = self.get_example_by_id(injection_loc)
+            # Step 1: Read in the orig training sequence (copied, as the list is modified below)
+            pt_train_seqs = list(orig_example)
             pt_train_szs = [len(one_seq) for one_seq in pt_train_seqs]
             assert len(np.concatenate(pt_train_seqs)) == self.train_seq_len + self.add_extra_token_to_seq
             # Step 2: Sample an injection position and offset for the new training sequence window
@@ -369,7 +729,7 @@ class WriteableMMapIndexedDataset:
             if dry_run:
                 # Generate the training sequence for visualization purposes only
                 # Step 1: Read in the orig training sequence
-                pt_train_seqs = self.get_example_by_id(injection_loc)
+                pt_train_seqs = orig_example
                 assert len(np.concatenate(pt_train_seqs)) == self.train_seq_len + self.add_extra_token_to_seq
                 # Step 2: Create the full sequence
                 concat_pt_seq = np.concatenate(pt_train_seqs)
@@ -386,6 +746,20 @@ class WriteableMMapIndexedDataset:
             dry_run=dry_run
         )
         injection_details.update(injection_doc_details)
+
+        if return_example:
+            if dry_run:
+                # Nothing was written, so the example is unchanged
+                return injection_details, orig_example
+            if injection_type == "seq_shuffle":
+                # The whole (windowed) sequence was written over the example
+                edited_seq = injection_data
+            else:
+                edited_seq = np.concatenate(orig_example)
+                edited_seq[:len(injection_data)] = injection_data
+            # The document layout is unchanged, so split along the original segment boundaries
+            edited_example = np.split(edited_seq, np.cumsum([len(one_seq) for one_seq in orig_example])[:-1])
+            return injection_details, edited_example
         return injection_details
 
 
@@ -402,6 +776,9 @@ def perturb_dataset(raw_dataset: str,
                     dry_run: bool = False,
                     perturbation_include_filters: Optional[List[str]] = None
                     ) -> None:
+    if MMapIndexedDataset is None:
+        raise ValueError("GPT-NeoX's megatron package must be installed to perturb a dataset")
+
     logger.warning(">>>>>>>>>>>>>>>>>>>>>>>>>")
     logger.warning("WARNING: Index sizes will be inconsistent with the actual document boundaries.")
     logger.warning("<<<<<<<<<<<<<<<<<<<<<<<<<")